@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.ann_index import IVFIndex, default_n_lists
+from common.vector_store import VectorStore
+
+# IVF 근사 검색 vs 정확 탐색: nprobe 별 recall@k / 지연시간 비교
+
+parser = argparse.ArgumentParser(description="IVF recall@k vs latency 벤치마크")
+parser.add_argument("--prefix", default="data/preprocess_results/enriched_project_history",
+                    help="벡터 저장소 prefix (--synthetic 미지정 시 사용)")
+parser.add_argument("--synthetic", type=int, help="저장소 대신 N건의 합성 벡터 사용 (군집 구조 포함)")
+parser.add_argument("--dim", type=int, default=1536, help="합성 벡터 차원")
+parser.add_argument("--queries", type=int, default=200)
+parser.add_argument("--top-k", type=int, default=10)
+parser.add_argument("--n-lists", type=int)
+parser.add_argument("--nprobe", default="1,2,4,8,16,32,64")
+parser.add_argument("--seed", type=int, default=0)
+args = parser.parse_args()
+
+rng = np.random.default_rng(args.seed)
+
+
+def normalize(vectors):
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+if args.synthetic:
+    # 실제 임베딩처럼 군집을 이루는 합성 데이터 (군집 중심 + 잡음)
+    centers = rng.normal(size=(max(1, args.synthetic // 200), args.dim)).astype(np.float32)
+    matrix = normalize(centers[rng.integers(len(centers), size=args.synthetic)]
+                       + 0.6 * rng.normal(size=(args.synthetic, args.dim)).astype(np.float32))
+else:
+    matrix = normalize(np.asarray(VectorStore(args.prefix).vectors, dtype=np.float32))
+
+# 질의: 저장된 벡터에 잡음을 섞어 "비슷하지만 동일하지 않은" 과업지시서를 흉내
+query_rows = rng.choice(len(matrix), size=min(args.queries, len(matrix)), replace=False)
+noise = rng.normal(scale=0.5 / np.sqrt(matrix.shape[1]), size=(len(query_rows), matrix.shape[1]))
+queries = normalize(matrix[query_rows] + noise.astype(np.float32))
+
+n_lists = args.n_lists or default_n_lists(len(matrix))
+start = time.perf_counter()
+index = IVFIndex.build(matrix, n_lists=n_lists, seed=args.seed)
+print(f"벡터 {len(matrix)}건 x {matrix.shape[1]}차원 / 리스트 {n_lists}개 / 빌드 {time.perf_counter() - start:.1f}초")
+
+
+def exact_search(query, k):
+    similarities = matrix @ query
+    top = np.argpartition(-similarities, k - 1)[:k]
+    return top[np.argsort(-similarities[top])]
+
+
+def measure(search):
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(search(query))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+
+exact_results, exact_p50, exact_p95 = measure(lambda q: exact_search(q, args.top_k))
+
+print(f"\n{'방식':<14}{'recall@' + str(args.top_k):>12}{'p50(ms)':>10}{'p95(ms)':>10}")
+print(f"{'exact':<14}{1.0:>12.3f}{exact_p50:>10.2f}{exact_p95:>10.2f}")
+for nprobe in (int(n) for n in args.nprobe.split(",")):
+    if nprobe > n_lists:
+        break
+    results, p50, p95 = measure(lambda q: index.search(matrix, q, args.top_k, nprobe=nprobe)[0])
+    recall = np.mean([
+        len(set(approx.tolist()) & set(exact.tolist())) / len(exact)
+        for approx, exact in zip(results, exact_results)
+    ])
+    print(f"{'ivf nprobe=' + str(nprobe):<14}{recall:>12.3f}{p50:>10.2f}{p95:>10.2f}")
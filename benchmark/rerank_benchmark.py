@@ -0,0 +1,126 @@
+import os
+import sys
+import json
+import argparse
+from collections import defaultdict
+
+import numpy as np
+from dotenv import load_dotenv
+from openai import AzureOpenAI
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.embedding import embed_texts
+from common.embedding_cache import open_default_cache
+from common.history import base_project_name, to_index_document
+from common.jsonl import read_jsonl
+from common.rerank import DEFAULT_WEIGHTS, FEATURE_ORDER, rerank
+from common.search_backend import PROJECT_INDEX, TEXT_FIELDS, LocalIndex
+
+# 프로젝트 재순위화 비용(ms) 대비 top-k 품질(P@k, MRR, nDCG) 비교 (로컬 벡터 저장소 대상)
+#
+# 1차 검색(vector / hybrid)으로 후보 N개를 가져와 그대로 자른 결과와 재순위화한 결과를 후보 수별로 비교한다.
+# 정답 세트는 retrieval_benchmark.py 와 같이 연도만 다른 같은 사업을 한 묶음으로 보거나 --queries 로 지정한다.
+
+load_dotenv()
+
+parser = argparse.ArgumentParser(description="프로젝트 재순위화 비용/품질 벤치마크")
+parser.add_argument("--data-dir", default="data/preprocess_results", help="벡터 저장소 디렉터리")
+parser.add_argument("--queries", help='정답 세트 JSONL ({"query": "...", "client": "...", "relevant_ids": ["proj-..."]})')
+parser.add_argument("--sample", type=int, default=200, help="자동 정답 세트 질의 수")
+parser.add_argument("--top-k", type=int, default=6)
+parser.add_argument("--candidates", default="20,50,100", help="재순위화 후보 수 목록")
+parser.add_argument("--first-stage", default="vector", choices=["vector", "hybrid"])
+parser.add_argument("--budget-ms", type=float, default=1000.0, help="재순위화 시간 예산 (벤치마크는 넉넉하게)")
+parser.add_argument("--ablation", action="store_true", help="특징을 하나씩 뺀 nDCG 도 출력")
+parser.add_argument("--seed", type=int, default=0)
+args = parser.parse_args()
+
+index = LocalIndex(os.path.join(args.data_dir, "enriched_project_history"), to_index_document, use_ann=False,
+                   text_fields=TEXT_FIELDS[PROJECT_INDEX] if args.first_stage == "hybrid" else None)
+
+if args.queries:
+    queries = [
+        ({"text": entry["query"], "client": entry.get("client", "")}, set(entry["relevant_ids"]))
+        for entry in read_jsonl(args.queries)
+    ]
+else:
+    metadata = list(read_jsonl(os.path.join(args.data_dir, "enriched_project_history.jsonl")))
+    groups = defaultdict(list)
+    for record in metadata:
+        groups[base_project_name(record["project_name"])].append(record)
+    candidates = sorted(name for name, records in groups.items() if len(records) >= 2 and name)
+    rng = np.random.default_rng(args.seed)
+    picked = rng.choice(len(candidates), size=min(args.sample, len(candidates)), replace=False)
+    queries = [
+        ({"text": candidates[i], "client": groups[candidates[i]][0]["client"]},
+         {r["id"] for r in groups[candidates[i]]})
+        for i in sorted(picked)
+    ]
+
+client = AzureOpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    api_version=os.getenv("OPENAI_API_VERSION"),
+    azure_endpoint=os.getenv("OPENAI_ENDPOINT")
+)
+query_embeddings = embed_texts(client, os.getenv("OPENAI_EMBEDDING_DEPLOYMENT"),
+                               [f"{query['text']} {query['client']}" for query, _ in queries],
+                               cache=open_default_cache())
+candidate_counts = [int(n) for n in args.candidates.split(",")]
+print(f"프로젝트 {len(index.documents)}건 / 질의 {len(queries)}개 / top-{args.top_k} / 1차 검색 {args.first_stage}")
+
+# 1차 검색은 가장 큰 후보 수로 한 번만 수행하고 후보 수별로 앞에서 자름
+first_stage = [
+    index.search(embedding, max(candidate_counts),
+                 query_text=f"{query['text']} {query['client']}" if args.first_stage == "hybrid" else None)
+    for (query, _), embedding in zip(queries, query_embeddings)
+]
+
+
+def metrics(ranked_ids, relevant):
+    hits = [doc_id in relevant for doc_id in ranked_ids[:args.top_k]]
+    dcg = sum(1.0 / np.log2(rank + 1) for rank, hit in enumerate(hits, 1) if hit)
+    ideal = sum(1.0 / np.log2(rank + 1) for rank in range(1, min(len(relevant), args.top_k) + 1))
+    return (
+        sum(hits) / args.top_k,
+        next((1.0 / rank for rank, hit in enumerate(hits, 1) if hit), 0.0),
+        dcg / ideal
+    )
+
+
+def evaluate(n_candidates, weights=None, reranking=True):
+    scores, latencies = [], []
+    for (query, relevant), results in zip(queries, first_stage):
+        candidates = results[:n_candidates]
+        if reranking:
+            ranked, stats = rerank(candidates, query, args.top_k, weights=weights, budget_ms=args.budget_ms)
+            latencies.append(stats["ms"])
+        else:
+            ranked = candidates
+        scores.append(metrics([doc["id"] for doc in ranked], relevant))
+    precision, reciprocal_rank, ndcg = np.mean(scores, axis=0)
+    return {
+        "P@k": precision,
+        "MRR": reciprocal_rank,
+        "nDCG": ndcg,
+        "p50_ms": np.percentile(latencies, 50) if latencies else 0.0,
+        "p95_ms": np.percentile(latencies, 95) if latencies else 0.0
+    }
+
+
+print(f"{'stage':>10} | {'N':>4} | {'P@k':>6} | {'MRR':>6} | {'nDCG':>6} | {'p50(ms)':>8} | {'p95(ms)':>8}")
+results = {"first_stage": evaluate(args.top_k, reranking=False)}
+m = results["first_stage"]
+print(f"{'1차 검색':>8} | {args.top_k:4d} | {m['P@k']:6.3f} | {m['MRR']:6.3f} | {m['nDCG']:6.3f} | {'-':>8} | {'-':>8}")
+for n in candidate_counts:
+    results[f"rerank@{n}"] = m = evaluate(n)
+    print(f"{'재순위화':>7} | {n:4d} | {m['P@k']:6.3f} | {m['MRR']:6.3f} | {m['nDCG']:6.3f} | "
+          f"{m['p50_ms']:8.2f} | {m['p95_ms']:8.2f}")
+
+if args.ablation:
+    n = candidate_counts[-1]
+    print(f"\n특징 제거 시 nDCG (후보 {n}개, 전체 {results[f'rerank@{n}']['nDCG']:.3f})")
+    for feature in FEATURE_ORDER:
+        weights = {**DEFAULT_WEIGHTS, feature: 0.0}
+        print(f"  - {feature:>11}: {evaluate(n, weights=weights)['nDCG']:.3f}")
+
+print(json.dumps({name: {k: round(float(v), 4) for k, v in m.items()} for name, m in results.items()}))
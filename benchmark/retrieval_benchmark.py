@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import json
+import argparse
+from collections import defaultdict
+
+import numpy as np
+from dotenv import load_dotenv
+from openai import AzureOpenAI
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.embedding import embed_texts
+from common.embedding_cache import open_default_cache
+from common.history import base_project_name, to_index_document
+from common.jsonl import read_jsonl
+from common.search_backend import PROJECT_INDEX, TEXT_FIELDS, LocalIndex
+
+# 프로젝트 이력 검색 모드(vector / bm25 / hybrid)별 precision@k, recall@k, MRR, nDCG 비교 (로컬 벡터 저장소 대상)
+#
+# 정답 세트를 지정하지 않으면 연도만 다른 같은 사업(예: "2022년 / 2023년 유선망 NMS 개발 유지보수")을 한 묶음으로 보고
+# "사업명 + 고객사" 질의에 대해 같은 묶음의 프로젝트를 정답으로 사용한다.
+
+load_dotenv()
+
+parser = argparse.ArgumentParser(description="프로젝트 이력 검색 모드별 relevance 벤치마크")
+parser.add_argument("--data-dir", default="data/preprocess_results", help="벡터 저장소 디렉터리")
+parser.add_argument("--queries", help='정답 세트 JSONL ({"query": "...", "relevant_ids": ["proj-..."]})')
+parser.add_argument("--sample", type=int, default=200, help="자동 정답 세트 질의 수")
+parser.add_argument("--top-k", type=int, default=6)
+parser.add_argument("--modes", default="vector,bm25,hybrid")
+parser.add_argument("--seed", type=int, default=0)
+args = parser.parse_args()
+
+index = LocalIndex(os.path.join(args.data_dir, "enriched_project_history"), to_index_document,
+                   use_ann=False, text_fields=TEXT_FIELDS[PROJECT_INDEX])
+documents = index.documents
+
+if args.queries:
+    queries = [(entry["query"], set(entry["relevant_ids"])) for entry in read_jsonl(args.queries)]
+else:
+    metadata = list(read_jsonl(os.path.join(args.data_dir, "enriched_project_history.jsonl")))
+    groups = defaultdict(list)
+    for record in metadata:
+        groups[base_project_name(record["project_name"])].append(record)
+    candidates = sorted(name for name, records in groups.items() if len(records) >= 2 and name)
+    rng = np.random.default_rng(args.seed)
+    picked = rng.choice(len(candidates), size=min(args.sample, len(candidates)), replace=False)
+    queries = [
+        (f"{candidates[i]} {groups[candidates[i]][0]['client']}", {r["id"] for r in groups[candidates[i]]})
+        for i in sorted(picked)
+    ]
+
+client = AzureOpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    api_version=os.getenv("OPENAI_API_VERSION"),
+    azure_endpoint=os.getenv("OPENAI_ENDPOINT")
+)
+query_embeddings = embed_texts(client, os.getenv("OPENAI_EMBEDDING_DEPLOYMENT"),
+                               [query for query, _ in queries], cache=open_default_cache())
+print(f"프로젝트 {len(documents)}건 / 질의 {len(queries)}개 / top-{args.top_k}")
+
+
+def search(mode, query, embedding, k):
+    if mode == "vector":
+        return [doc["id"] for doc in index.search(embedding, k)]
+    if mode == "bm25":
+        rows, _ = index.bm25.search(query, k)
+        return [documents[row]["id"] for row in rows]
+    return [doc["id"] for doc in index.search(embedding, k, query_text=query)]
+
+
+def evaluate(mode):
+    precision, recall, reciprocal_rank, ndcg, latencies = [], [], [], [], []
+    for (query, relevant), embedding in zip(queries, query_embeddings):
+        start = time.perf_counter()
+        ranked = search(mode, query, embedding, args.top_k)
+        latencies.append(time.perf_counter() - start)
+
+        hits = [doc_id in relevant for doc_id in ranked]
+        precision.append(sum(hits) / args.top_k)
+        recall.append(sum(hits) / len(relevant))
+        reciprocal_rank.append(next((1.0 / rank for rank, hit in enumerate(hits, 1) if hit), 0.0))
+        dcg = sum(1.0 / np.log2(rank + 1) for rank, hit in enumerate(hits, 1) if hit)
+        ideal = sum(1.0 / np.log2(rank + 1) for rank in range(1, min(len(relevant), args.top_k) + 1))
+        ndcg.append(dcg / ideal)
+    return {
+        "P@k": np.mean(precision),
+        "R@k": np.mean(recall),
+        "MRR": np.mean(reciprocal_rank),
+        "nDCG": np.mean(ndcg),
+        "p50_ms": np.percentile(latencies, 50) * 1000
+    }
+
+
+print(f"{'mode':>8} | {'P@k':>6} | {'R@k':>6} | {'MRR':>6} | {'nDCG':>6} | {'p50(ms)':>8}")
+results = {}
+for mode in args.modes.split(","):
+    results[mode] = evaluate(mode)
+    m = results[mode]
+    print(f"{mode:>8} | {m['P@k']:6.3f} | {m['R@k']:6.3f} | {m['MRR']:6.3f} | {m['nDCG']:6.3f} | {m['p50_ms']:8.2f}")
+
+print(json.dumps({mode: {k: round(float(v), 4) for k, v in m.items()} for mode, m in results.items()}))
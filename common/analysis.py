@@ -0,0 +1,301 @@
+import json
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+# ✅ 과업지시서 분석 JSON 스키마 (프롬프트 예시 + 청크 결과 병합 기준)
+ANALYSIS_SCHEMA = {
+    "project_info": {
+        "project_title": "과업명/프로젝트명",
+        "client_organization": "발주처/고객사",
+        "project_period": "과업기간",
+        "project_budget": "과업예산",
+        "project_manager": "과업관리자 이름만",
+        "delivery_location": "결과물 납품장소"
+    },
+    "objectives": {
+        "main_purpose": "과업의 주요 목적",
+        "expected_outcomes": ["기대성과1", "기대성과2"],
+        "success_criteria": ["성공기준1", "성공기준2"]
+    },
+    "scope_of_work": {
+        "main_tasks": ["주요업무1", "주요업무2"],
+        "detailed_activities": ["세부활동1", "세부활동2"],
+        "exclusions": ["제외사항1", "제외사항2"]
+    },
+    "technical_requirements": {
+        "technologies": ["기술요구사항1", "기술요구사항2"],
+        "platforms": ["플랫폼1", "플랫폼2"],
+        "standards": ["표준/규격1", "표준/규격2"],
+        "security_requirements": ["보안요구사항1", "보안요구사항2"]
+    },
+    "deliverables": {
+        "documents": ["문서산출물1", "문서산출물2"],
+        "systems": ["시스템산출물1", "시스템산출물2"],
+        "reports": ["보고서1", "보고서2"]
+    },
+    "timeline": {
+        "phases": ["단계1", "단계2"],
+        "milestones": ["마일스톤1", "마일스톤2"],
+        "key_dates": ["주요일정1", "주요일정2"]
+    },
+    "resources": {
+        "required_roles": ["필요역할1", "필요역할2"],
+        "skill_requirements": ["필요기술1", "필요기술2"],
+        "equipment_needs": ["필요장비1", "필요장비2"]
+    }
+}
+
+
+def _schema_placeholders(schema):
+    values = set()
+    for value in schema.values():
+        if isinstance(value, dict):
+            values |= _schema_placeholders(value)
+        elif isinstance(value, list):
+            values |= set(value)
+        else:
+            values.add(value)
+    return values
+
+
+# 모델이 예시 값을 그대로 돌려준 경우 병합에서 제외
+SCHEMA_PLACEHOLDERS = _schema_placeholders(ANALYSIS_SCHEMA)
+
+
+def schema_json():
+    """프롬프트에 넣을 JSON 형식 예시"""
+    return json.dumps(ANALYSIS_SCHEMA, ensure_ascii=False, indent=4)
+
+
+# ✅ 섹션 제목으로 보이는 줄: "제1장", "Ⅱ.", "IV.", "3.", "3.2", "1)", "가.", "□" 등
+HEADING_PATTERN = re.compile(
+    r"^\s*(제\s*\d+\s*[장절조항]|[ⅠⅡⅢⅣⅤⅥⅦⅧⅨⅩ]+\.?\s|[IVX]+\.\s|\d+(\.\d+)*\.?\s|\d+\)\s|[가-하]\.\s|[□■◎◆▣])"
+)
+
+
+def split_sections(text):
+    """섹션 제목 줄을 경계로 문서를 나눔 (제목 줄은 다음 섹션의 첫 줄)"""
+    sections = []
+    current = []
+    for line in text.splitlines():
+        if HEADING_PATTERN.match(line) and any(part.strip() for part in current):
+            sections.append("\n".join(current))
+            current = []
+        current.append(line)
+    if any(part.strip() for part in current):
+        sections.append("\n".join(current))
+    return sections
+
+
+def _split_long(section, max_chars):
+    """한 섹션이 청크보다 길면 문단 → 줄 → 글자 수 순서로 나눔"""
+    if len(section) <= max_chars:
+        return [section]
+    for separator in ("\n\n", "\n"):
+        parts = section.split(separator)
+        if len(parts) > 1:
+            return _pack([piece for part in parts for piece in _split_long(part, max_chars)],
+                         max_chars, separator)
+    return [section[start:start + max_chars] for start in range(0, len(section), max_chars)]
+
+
+def _pack(parts, max_chars, separator):
+    chunks = []
+    current = []
+    size = 0
+    for part in parts:
+        if current and size + len(separator) + len(part) > max_chars:
+            chunks.append(separator.join(current))
+            current, size = [], 0
+        current.append(part)
+        size += len(part) + (len(separator) if size else 0)
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
+
+
+def split_document(text, chunk_chars, max_chunks=None):
+    """섹션 경계 기준으로 최대 chunk_chars 글자씩 묶은 청크 목록
+
+    청크 크기는 늘리지 않는다 (모델 입력 한도와 토큰 사용량 상한 유지).
+    청크 수가 max_chunks 를 넘으면 sample_chunks 로 문서 전체에서 고르게 고른다.
+    """
+    text = text.strip()
+    if not text:
+        return []
+    pieces = [piece for section in split_sections(text) for piece in _split_long(section, chunk_chars)]
+    chunks = _pack(pieces, chunk_chars, "\n")
+    if max_chunks and len(chunks) > max_chunks:
+        return sample_chunks(chunks, max_chunks)
+    return chunks
+
+
+def sample_chunks(chunks, max_chunks):
+    """청크 목록에서 처음·끝을 포함해 같은 간격으로 max_chunks 개 선택 (문서 뒷부분 요구사항도 일부 반영)"""
+    n = len(chunks)
+    if n <= max_chunks:
+        return list(chunks)
+    if max_chunks <= 1:
+        return list(chunks[:1])
+    return [chunks[round(i * (n - 1) / (max_chunks - 1))] for i in range(max_chunks)]
+
+
+def _dedup_key(item):
+    if isinstance(item, str):
+        text = unicodedata.normalize("NFKC", item).casefold()
+        return re.sub(r"[\s\W_]+", "", text)
+    return json.dumps(item, ensure_ascii=False, sort_keys=True)
+
+
+def _is_empty(value):
+    if isinstance(value, (dict, list)):
+        return not value
+    return value is None or value == "" or value in SCHEMA_PLACEHOLDERS
+
+
+def _merge_into(target, source):
+    for key, value in source.items():
+        if isinstance(value, dict):
+            if not isinstance(target.get(key), dict):
+                target[key] = {}
+            _merge_into(target[key], value)
+        elif isinstance(value, list):
+            if not isinstance(target.get(key), list):
+                target[key] = []
+            seen = {_dedup_key(item) for item in target[key]}
+            for item in value:
+                if _is_empty(item):
+                    continue
+                item_key = _dedup_key(item)
+                if item_key and item_key not in seen:
+                    target[key].append(item)
+                    seen.add(item_key)
+        elif not _is_empty(value) and _is_empty(target.get(key)):
+            # 단일 값은 앞쪽 청크(문서 앞부분)에서 먼저 나온 값을 사용
+            target[key] = value
+
+
+def merge_analyses(results):
+    """청크별 분석 결과를 문서 순서대로 병합 (목록은 중복 제거, 단일 값은 첫 값 우선)"""
+    merged = {}
+    for result in results:
+        if isinstance(result, dict):
+            _merge_into(merged, result)
+    return merged
+
+
+# ✅ 응답 파싱 경로: json(그대로 파싱) / extracted(코드 블록·앞뒤 문장 제거 후 파싱) / repaired(복구 호출 성공)
+#    / partial(복구 후에도 스키마 오류가 남아 보정된 일부 항목만 사용) / failed
+PARSE_PATHS = ("json", "extracted", "repaired", "partial", "failed")
+
+_FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+
+
+def extract_json(text):
+    """LLM 응답 → (JSON 객체, 파싱 경로) 실패 시 (None, None)
+
+    ```json 코드 블록이나 앞뒤 설명 문장이 붙은 응답도 첫 번째 JSON 객체를 찾아 파싱한다.
+    """
+    if not text:
+        return None, None
+    try:
+        return json.loads(text), "json"
+    except ValueError:
+        pass
+
+    decoder = json.JSONDecoder()
+    candidates = [block.strip() for block in _FENCE_PATTERN.findall(text)] + [text]
+    for candidate in candidates:
+        start = candidate.find("{")
+        while start != -1:
+            try:
+                return decoder.raw_decode(candidate, start)[0], "extracted"
+            except ValueError:
+                start = candidate.find("{", start + 1)
+    return None, None
+
+
+def _validate(value, expected, path, errors):
+    """스키마 형태로 값 보정 (None → 빈 값, 숫자 → 문자열, 문자열 → 1개짜리 배열), 보정 불가 시 오류 기록"""
+    if isinstance(expected, dict):
+        if value is None:
+            return {}
+        if not isinstance(value, dict):
+            errors.append(f"{path}: 객체여야 합니다")
+            return {}
+        return {
+            key: _validate(item, expected[key], f"{path}.{key}", errors)
+            for key, item in value.items()
+            if key in expected  # 스키마에 없는 키는 버림
+        }
+
+    if isinstance(expected, list):
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [value] if value.strip() else []
+        if not isinstance(value, list):
+            errors.append(f"{path}: 배열이어야 합니다")
+            return []
+        items = []
+        for item in value:
+            if isinstance(item, (int, float)) and not isinstance(item, bool):
+                item = str(item)
+            if isinstance(item, str):
+                items.append(item)
+            elif item is not None:
+                errors.append(f"{path}: 배열 항목은 문자열이어야 합니다")
+        return items
+
+    if value is None:
+        return ""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    if not isinstance(value, str):
+        errors.append(f"{path}: 문자열이어야 합니다")
+        return ""
+    return value
+
+
+def validate_analysis(data):
+    """분석 결과 스키마 검증 → (보정된 결과, 오류 목록)"""
+    if not isinstance(data, dict):
+        return None, ["최상위 값이 JSON 객체가 아닙니다"]
+    if not any(key in ANALYSIS_SCHEMA for key in data):
+        return None, [f"스키마 항목({', '.join(ANALYSIS_SCHEMA)})이 하나도 없습니다"]
+    errors = []
+    return _validate(data, ANALYSIS_SCHEMA, "$", errors), errors
+
+
+def repair_prompt(output, errors, max_chars=8000):
+    """잘못된 분석 응답만 고치는 복구 요청 프롬프트 (원문 과업지시서는 다시 보내지 않음)"""
+    return f"""
+아래 출력은 요구한 JSON 형식에 맞지 않습니다. 내용은 유지하고 형식만 고친 JSON 객체 하나만 출력하세요.
+
+오류:
+{chr(10).join(f"- {error}" for error in errors[:20])}
+
+JSON 형식:
+{schema_json()}
+
+잘못된 출력:
+{output[:max_chars]}
+"""
+
+
+class ParseStats:
+    """분석 응답 파싱 경로별 횟수 (서버 프로세스 단위로 공유)"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, path, count=1):
+        with self._lock:
+            self.counts[path] += count
+
+    def snapshot(self):
+        with self._lock:
+            return {path: self.counts[path] for path in PARSE_PATHS}
@@ -0,0 +1,119 @@
+import hashlib
+
+import numpy as np
+
+# ✅ IVF(Inverted File) 근사 최근접 탐색: 구면 k-means 로 벡터를 n_lists 개 클러스터에 나누고
+#    질의와 가까운 nprobe 개 클러스터 안에서만 정확한 코사인 점수를 계산한다.
+DEFAULT_NPROBE = 8
+_CHUNK_SIZE = 8192
+
+
+def _assign(matrix, centroids):
+    """각 벡터에 가장 가까운(내적 최대) 중심 번호 (메모리 절약을 위해 나누어 계산)"""
+    labels = np.empty(len(matrix), dtype=np.int32)
+    for start in range(0, len(matrix), _CHUNK_SIZE):
+        chunk = np.asarray(matrix[start:start + _CHUNK_SIZE], dtype=np.float32)
+        labels[start:start + _CHUNK_SIZE] = np.argmax(chunk @ centroids.T, axis=1)
+    return labels
+
+
+def _normalize(vectors):
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def default_n_lists(n_rows):
+    return max(1, min(n_rows, int(4 * np.sqrt(n_rows))))
+
+
+class IVFIndex:
+    """정규화된 벡터 행렬용 IVF 인덱스 (순수 NumPy)"""
+
+    def __init__(self, centroids, list_offsets, list_ids, fingerprint=""):
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_ids = list_ids
+        # 인덱스를 만든 벡터 저장소 식별값 (저장소가 갱신되면 인덱스도 다시 만들어야 함)
+        self.fingerprint = fingerprint
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    @property
+    def n_rows(self):
+        return len(self.list_ids)
+
+    @classmethod
+    def build(cls, matrix, n_lists=None, n_iter=20, train_size=None, seed=0, fingerprint=""):
+        """구면 k-means 로 coarse quantizer 학습 후 전체 벡터를 리스트에 배정"""
+        rng = np.random.default_rng(seed)
+        n_rows = len(matrix)
+        n_lists = n_lists or default_n_lists(n_rows)
+        train_size = min(n_rows, train_size or 256 * n_lists)
+
+        train_ids = np.sort(rng.choice(n_rows, size=train_size, replace=False))
+        train = np.asarray(matrix[train_ids], dtype=np.float32)
+        centroids = train[rng.choice(train_size, size=n_lists, replace=False)].copy()
+
+        for _ in range(n_iter):
+            labels = _assign(train, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, train)
+            counts = np.bincount(labels, minlength=n_lists)
+            # 비어 있는 클러스터는 임의의 학습 벡터로 다시 초기화
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = train[rng.choice(train_size, size=int(empty.sum()), replace=False)]
+            centroids = _normalize(sums)
+
+        labels = _assign(matrix, centroids)
+        order = np.argsort(labels, kind="stable").astype(np.int64)
+        counts = np.bincount(labels, minlength=n_lists)
+        list_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return cls(centroids.astype(np.float32), list_offsets, order, fingerprint)
+
+    def search(self, matrix, query, top_k, nprobe=DEFAULT_NPROBE):
+        """nprobe 개 리스트만 탐색 → (행 번호 배열, 코사인 유사도 배열) 유사도 내림차순"""
+        nprobe = max(1, min(nprobe, self.n_lists))
+        centroid_scores = self.centroids @ query
+        probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        candidates = np.concatenate([
+            self.list_ids[self.list_offsets[p]:self.list_offsets[p + 1]] for p in probes
+        ])
+        if len(candidates) == 0:
+            return candidates, np.empty(0, dtype=np.float32)
+
+        similarities = matrix[candidates] @ query
+        k = min(top_k, len(candidates))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+        return candidates[top], similarities[top]
+
+    def save(self, path):
+        np.savez(path, centroids=self.centroids, list_offsets=self.list_offsets,
+                 list_ids=self.list_ids, fingerprint=np.array(self.fingerprint))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["centroids"], data["list_offsets"], data["list_ids"], str(data["fingerprint"]))
+
+
+def ann_path(prefix):
+    """벡터 저장소 옆에 저장되는 IVF 인덱스 파일 경로"""
+    return f"{prefix}.ivf.npz"
+
+
+def store_fingerprint(ids, vectors):
+    """벡터 저장소 해시 (행 순서(문서 ID 목록) + 행 수/차원 + 벡터 값)
+
+    같은 ID 로 다시 임베딩한 경우(모델 변경, 식별 필드가 같은 내용 수정)에도 기존 IVF 를 쓰지 않도록 벡터 값까지 포함한다.
+    """
+    digest = hashlib.sha1()
+    for doc_id in ids:
+        digest.update(str(doc_id).encode("utf-8"))
+        digest.update(b"\n")
+    vectors = np.ascontiguousarray(vectors)
+    digest.update(f"{vectors.shape}|{vectors.dtype}".encode("utf-8"))
+    digest.update(memoryview(vectors).cast("B"))
+    return digest.hexdigest()
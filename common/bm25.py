@@ -0,0 +1,73 @@
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+import numpy as np
+
+# ✅ 한국어 형태소 분석기 없이 쓸 수 있도록 한글은 2글자 단위(bigram), 영문/숫자는 단어 단위로 색인
+_TOKEN_PATTERN = re.compile(r"[0-9a-z]+|[가-힣]+")
+
+
+def tokenize(text):
+    """NFKC + 소문자 정규화 후 토큰 목록 ("주식회사 케이티 5G NMS" → 주식, 식회, 회사, 케이, 이티, 5g, nms)"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    tokens = []
+    for word in _TOKEN_PATTERN.findall(text):
+        if "가" <= word[0] <= "힣" and len(word) > 2:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+class BM25Index:
+    """순수 Python/NumPy BM25 (Okapi) 역색인"""
+
+    def __init__(self, texts, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        postings = defaultdict(lambda: ([], []))
+        lengths = []
+        for row, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                rows, tfs = postings[term]
+                rows.append(row)
+                tfs.append(tf)
+
+        self.n_docs = len(lengths)
+        self.doc_lengths = np.asarray(lengths, dtype=np.float32)
+        avg_length = float(self.doc_lengths.mean()) if self.n_docs else 0.0
+        # 문서 길이 정규화 항은 미리 계산 (k1 * (1 - b + b * dl / avgdl))
+        self._length_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / max(avg_length, 1e-9))
+        self.postings = {
+            term: (np.asarray(rows, dtype=np.int64), np.asarray(tfs, dtype=np.float32))
+            for term, (rows, tfs) in postings.items()
+        }
+        self.idf = {
+            term: math.log(1 + (self.n_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+            for term, (rows, _) in self.postings.items()
+        }
+
+    def scores(self, query):
+        """전체 문서의 BM25 점수 배열"""
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for term, qtf in Counter(tokenize(query)).items():
+            if term not in self.postings:
+                continue
+            rows, tfs = self.postings[term]
+            scores[rows] += qtf * self.idf[term] * tfs * (self.k1 + 1) / (tfs + self._length_norm[rows])
+        return scores
+
+    def search(self, query, top_k, mask=None):
+        """(행 번호 배열, BM25 점수 배열) 점수 내림차순, 점수 0 인 문서와 mask=False 인 문서 제외"""
+        scores = self.scores(query)
+        matched = np.flatnonzero((scores > 0) & mask if mask is not None else scores > 0)
+        if len(matched) == 0:
+            return matched, np.empty(0, dtype=np.float32)
+        k = min(top_k, len(matched))
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return top, scores[top]
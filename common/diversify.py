@@ -0,0 +1,106 @@
+import re
+import unicodedata
+
+import numpy as np
+
+from common.bm25 import tokenize
+from common.history import base_project_name
+
+# ✅ 프로젝트 검색 결과 다양화: 연도만 다른 같은 사업 묶기 + MMR(Maximal Marginal Relevance)
+#    MMR 점수 = λ · 관련도 - (1 - λ) · 이미 고른 결과와의 최대 유사도 (λ=1 이면 관련도 순서 그대로)
+DEFAULT_LAMBDA = 0.7
+DEFAULT_MMR_CANDIDATES = 30
+
+_NON_WORD_PATTERN = re.compile(r"[^0-9a-z가-힣]")
+
+
+def duplicate_key(doc):
+    """같은 사업 판별 키: 연도·공백·기호를 뺀 프로젝트명 + 고객사 ("2023년 5G NMS 개발유지보수" = "'24년 5G NMS 개발 유지보수")"""
+    name = unicodedata.normalize("NFKC", base_project_name(doc.get("project_name", ""))).lower()
+    client = unicodedata.normalize("NFKC", doc.get("client") or "").lower()
+    return _NON_WORD_PATTERN.sub("", name), _NON_WORD_PATTERN.sub("", client)
+
+
+def collapse_duplicates(docs):
+    """관련도 순 문서 목록에서 같은 사업은 가장 앞(관련도 높은) 문서 하나만 남기고, 나머지 이름은 duplicates 에 기록"""
+    kept = {}
+    for doc in docs:
+        key = duplicate_key(doc)
+        if key not in kept:
+            kept[key] = {**doc, "duplicates": []}
+        else:
+            kept[key]["duplicates"].append(doc.get("project_name", ""))
+    return list(kept.values())
+
+
+def _normalize_rows(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+
+def lexical_vectors(texts):
+    """임베딩이 없을 때 대체할 이진 단어(bigram) 벡터 (후보 수 × 어휘 수)"""
+    token_sets = [set(tokenize(text)) for text in texts]
+    vocabulary = {term: i for i, term in enumerate(sorted(set().union(*token_sets)))}
+    matrix = np.zeros((len(token_sets), max(len(vocabulary), 1)), dtype=np.float32)
+    for row, terms in enumerate(token_sets):
+        matrix[row, [vocabulary[term] for term in terms]] = 1.0
+    return matrix
+
+
+def mmr(vectors, relevance, top_k, lambda_=DEFAULT_LAMBDA):
+    """MMR 탐욕 선택 → 선택된 행 번호 목록
+
+    후보 간 코사인 유사도 행렬을 한 번 계산하고, 선택할 때마다 '선택된 결과와의 최대 유사도' 벡터만 갱신한다.
+    """
+    relevance = np.asarray(relevance, dtype=np.float32)
+    n = len(relevance)
+    if n == 0 or top_k <= 0:
+        return []
+    vectors = _normalize_rows(vectors)
+    similarity = vectors @ vectors.T
+
+    first = int(np.argmax(relevance))
+    selected = [first]
+    max_similarity = similarity[first].copy()
+    available = np.ones(n, dtype=bool)
+    available[first] = False
+    while len(selected) < min(top_k, n):
+        scores = lambda_ * relevance - (1 - lambda_) * max_similarity
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_similarity, similarity[best], out=max_similarity)
+    return selected
+
+
+def diversify(docs, top_k, lambda_=DEFAULT_LAMBDA, collapse=True):
+    """관련도 순 후보 → 같은 사업 묶기 + MMR 로 고른 상위 top_k (embedding 필드는 제거)
+
+    후보에 embedding 이 없으면 프로젝트명/요약의 단어 벡터로 유사도를 계산한다.
+    관련도는 점수 스케일(코사인 / RRF / 재순위화)에 관계없도록 입력 순위 기반 0~1 값을 사용한다.
+    → (문서 목록, 통계 {"candidates", "collapsed", "similarity"})
+    """
+    docs = list(docs)
+    stats = {"candidates": len(docs), "collapsed": 0, "similarity": "embedding"}
+    if collapse:
+        docs = collapse_duplicates(docs)
+        stats["collapsed"] = stats["candidates"] - len(docs)
+    if not docs:
+        return [], stats
+
+    if all(doc.get("embedding") is not None for doc in docs):
+        vectors = np.stack([np.asarray(doc["embedding"], dtype=np.float32) for doc in docs])
+    else:
+        stats["similarity"] = "lexical"
+        vectors = lexical_vectors(f"{doc.get('project_name', '')} {doc.get('summary_text', '')}" for doc in docs)
+    relevance = 1.0 - np.arange(len(docs), dtype=np.float32) / len(docs)
+
+    selected = mmr(vectors, relevance, top_k, lambda_=lambda_)
+    results = []
+    for row in selected:
+        doc = dict(docs[row])
+        doc.pop("embedding", None)
+        results.append(doc)
+    return results, stats
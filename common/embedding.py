@@ -0,0 +1,114 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+# ✅ 배치/동시성 기본값 (Azure OpenAI 임베딩은 요청당 최대 2048개 입력 허용)
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_RETRIES = 6
+
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+
+
+def _retry_after_seconds(error, attempt):
+    """Retry-After 헤더가 있으면 따르고, 없으면 지수 백오프 + 지터"""
+    response = getattr(error, "response", None)
+    if response is not None:
+        retry_after = response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+    return min(60.0, 2 ** attempt) + random.uniform(0, 1)
+
+
+def _embed_batch(client, model, batch, max_retries):
+    """단일 배치 임베딩 요청 (rate limit 시 백오프 후 재시도)"""
+    for attempt in range(max_retries + 1):
+        try:
+            response = client.embeddings.create(model=model, input=batch)
+            # 응답 순서가 입력 순서와 다를 수 있으므로 index 기준으로 정렬
+            return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+        except RETRYABLE_ERRORS as e:
+            if attempt == max_retries:
+                raise
+            wait = _retry_after_seconds(e, attempt)
+            print(f"[WARN] 임베딩 요청 재시도 {attempt + 1}/{max_retries} ({type(e).__name__}) → {wait:.1f}초 대기")
+            time.sleep(wait)
+
+
+def embed_texts(client, model, texts, batch_size=DEFAULT_BATCH_SIZE,
+                max_workers=DEFAULT_MAX_WORKERS, max_retries=DEFAULT_MAX_RETRIES,
+                progress=None, cache=None):
+    """여러 텍스트를 배치 단위로 동시에 임베딩 (입력 순서 유지, 캐시 적중분은 요청 생략)"""
+    texts = list(texts)
+    embeddings = cache.get_many(model, texts) if cache is not None else [None] * len(texts)
+    if progress is not None:
+        progress.update(sum(1 for e in embeddings if e is not None))
+
+    # 캐시 미스 텍스트만 중복 제거 후 요청
+    missing = [t for t, e in zip(texts, embeddings) if e is None]
+    pending = list(dict.fromkeys(missing))
+    if pending:
+        fetched = dict(zip(pending, _embed_uncached(client, model, pending, batch_size,
+                                                    max_workers, max_retries, progress)))
+        if cache is not None:
+            cache.put_many(model, pending, [fetched[t] for t in pending])
+        embeddings = [e if e is not None else fetched[t] for t, e in zip(texts, embeddings)]
+        if progress is not None:
+            progress.update(len(missing) - len(pending))
+
+    return embeddings
+
+
+def _embed_uncached(client, model, texts, batch_size, max_workers, max_retries, progress):
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    results = [None] * len(batches)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_embed_batch, client, model, batch, max_retries): i
+            for i, batch in enumerate(batches)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            results[i] = future.result()
+            if progress is not None:
+                progress.update(len(batches[i]))
+
+    return [embedding for batch_result in results for embedding in batch_result]
+
+
+def embed_text(client, model, text, cache=None):
+    """단일 텍스트 임베딩 (캐시 사용)"""
+    return embed_texts(client, model, [text], cache=cache)[0]
+
+
+def iter_embedded(client, model, items, text_key, batch_size=DEFAULT_BATCH_SIZE,
+                  max_workers=DEFAULT_MAX_WORKERS, progress=None, cache=None):
+    """레코드 스트림에 embedding 필드를 채워 순서대로 반환
+
+    한 번에 batch_size * max_workers 건만 메모리에 보관하므로 입력 크기와 무관하게 메모리 사용량이 일정하다.
+    """
+    window_size = batch_size * max_workers
+    window = []
+    for item in items:
+        window.append(item)
+        if len(window) >= window_size:
+            yield from _embed_window(client, model, window, text_key, batch_size, max_workers, progress, cache)
+            window = []
+    if window:
+        yield from _embed_window(client, model, window, text_key, batch_size, max_workers, progress, cache)
+
+
+def _embed_window(client, model, window, text_key, batch_size, max_workers, progress, cache):
+    embeddings = embed_texts(
+        client, model, [item[text_key] for item in window],
+        batch_size=batch_size, max_workers=max_workers, progress=progress, cache=cache
+    )
+    for item, embedding in zip(window, embeddings):
+        item["embedding"] = embedding
+        yield item
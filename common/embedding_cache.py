@@ -0,0 +1,146 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+import numpy as np
+
+# ✅ 기본 캐시 위치 / 최대 크기
+DEFAULT_CACHE_PATH = "data/cache/embedding_cache.sqlite"
+DEFAULT_MAX_MB = 512
+
+
+def normalize_text(text):
+    """캐시 키용 텍스트 정규화 (유니코드 NFC + 공백 정리)"""
+    text = unicodedata.normalize("NFC", text or "")
+    return " ".join(text.split())
+
+
+def text_hash(text):
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """(배포 이름, 정규화 텍스트 해시) 기준 SQLite 임베딩 캐시"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON embeddings(last_access)")
+        self._conn.commit()
+
+    def get_many(self, model, texts):
+        """텍스트 목록 조회 → 입력 순서대로 임베딩 또는 None"""
+        keys = [text_hash(t) for t in texts]
+        found = {}
+        with self._lock:
+            unique_keys = list(dict.fromkeys(keys))
+            # SQLite 바인딩 변수 개수 제한을 피하기 위해 나누어 조회
+            for i in range(0, len(unique_keys), 500):
+                chunk = unique_keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *chunk]
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, key) for key in found]
+                )
+                self._conn.commit()
+
+            results = [found.get(key) for key in keys]
+            hit_count = sum(1 for r in results if r is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        return results
+
+    def get(self, model, text):
+        return self.get_many(model, [text])[0]
+
+    def put_many(self, model, texts, embeddings):
+        now = time.time()
+        rows = []
+        for text, embedding in zip(texts, embeddings):
+            blob = np.asarray(embedding, dtype=np.float32).tobytes()
+            rows.append((model, text_hash(text), blob, len(blob), now))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            self._evict()
+
+    def put(self, model, text, embedding):
+        self.put_many(model, [text], [embedding])
+
+    def _evict(self):
+        """총 크기가 한도를 넘으면 가장 오래 사용되지 않은 항목부터 삭제"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for model, key, size in self._conn.execute(
+            "SELECT model, text_hash, size FROM embeddings ORDER BY last_access ASC"
+        ):
+            victims.append((model, key))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM embeddings WHERE model = ? AND text_hash = ?", victims)
+        self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            count, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM embeddings"
+            ).fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": count,
+            "bytes": size
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_default_cache():
+    """환경 변수 설정으로 캐시 열기 (EMBEDDING_CACHE_PATH 를 비워두면 비활성화)"""
+    path = os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH)
+    if not path:
+        return None
+    max_mb = float(os.getenv("EMBEDDING_CACHE_MAX_MB", str(DEFAULT_MAX_MB)))
+    return EmbeddingCache(path, max_bytes=int(max_mb * 1024 * 1024))
@@ -0,0 +1,207 @@
+import csv
+import datetime
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+
+# ✅ 프로젝트 식별에 사용하는 CSV 컬럼 (금액/종료일 등은 변경 대상 → 식별자에서 제외)
+IDENTITY_COLUMNS = ["프로젝트명", "고객명", "시작일", "수주부서명", "수행부서명"]
+
+# ✅ 인덱스에 반영된 레코드 해시 목록
+DEFAULT_MANIFEST_PATH = "data/preprocess_results/history_index_manifest.json"
+
+
+# 식별 컬럼에 대응하는 레코드 필드명
+IDENTITY_FIELDS = ["project_name", "client", "start_date", "order_department", "department"]
+
+
+class ProjectIdAssigner:
+    """CSV 행 내용 기반의 안정적인 프로젝트 ID 생성
+
+    동일한 식별 컬럼을 가진 행이 여러 개면 등장 순서대로 접미사를 붙인다.
+    다른 행이 추가/삭제되어도 기존 행의 ID는 바뀌지 않는다.
+    """
+
+    def __init__(self):
+        self._seen = {}
+
+    def __call__(self, row):
+        return self._assign([row[col] for col in IDENTITY_COLUMNS])
+
+    def for_record(self, record):
+        """이미 변환된 레코드(기존 enriched JSON 등)에 대해 동일한 ID 생성"""
+        return self._assign([record[field] for field in IDENTITY_FIELDS])
+
+    def _assign(self, values):
+        key = "\x1f".join(value.strip() for value in values)
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        occurrence = self._seen.get(digest, 0) + 1
+        self._seen[digest] = occurrence
+        return f"proj-{digest}" if occurrence == 1 else f"proj-{digest}-{occurrence}"
+
+
+def build_record(row, project_id):
+    """CSV 행 → 프로젝트 이력 레코드"""
+    summary_text = (
+        f"{row['수행부서명']}이(가) {row['프로젝트명']} 프로젝트를 수행하였으며, "
+        f"기간은 {row['시작일']} ~ {row['종료일']}, "
+        f"계약 금액은 {row['수주계약금액']}원, "
+        f"포트폴리오는 {row['포트폴리오']}, "
+        f"수주부서는 {row['수주부서명']}, "
+        f"고객사는 {row['고객명']}입니다."
+    )
+
+    record = {
+        "id": project_id,
+        "department": row["수행부서명"],
+        "project_name": row["프로젝트명"],
+        "start_date": row["시작일"],
+        "end_date": row["종료일"],
+        "portfolio": row["포트폴리오"],
+        "contract_amount": row["수주계약금액"],
+        "order_department": row["수주부서명"],
+        "client": row["고객명"],
+        "summary_text": summary_text
+    }
+    record["content_hash"] = record_hash(record)
+    return record
+
+
+def iter_csv_records(csv_path):
+    """cp949 프로젝트 이력 CSV를 한 행씩 레코드로 변환"""
+    with open(csv_path, newline='', encoding='cp949') as csvfile:
+        assign_id = ProjectIdAssigner()
+        for row in csv.DictReader(csvfile):
+            yield build_record(row, assign_id(row))
+
+
+# 연도 표기: "2023년", "23년도", 단독 "2023"
+_YEAR_PATTERN = re.compile(r"(?<!\d)((19|20)?\d{2}\s*년도?|(19|20)\d{2})(?!\d)")
+
+
+def base_project_name(name):
+    """연도 표기를 뺀 프로젝트명 ("2023년 5G NMS  개발유지보수" → "5G NMS 개발유지보수"), 매년 갱신되는 계약 묶음용"""
+    return " ".join(_YEAR_PATTERN.sub(" ", name or "").split())
+
+
+def parse_date(value):
+    """"2023.04.05" → "2023-04-05T00:00:00Z" (Edm.DateTimeOffset), 형식이 다르면 None"""
+    match = re.fullmatch(r"\s*(\d{4})[.\-/](\d{1,2})[.\-/](\d{1,2})\s*", value or "")
+    if not match:
+        return None
+    year, month, day = (int(part) for part in match.groups())
+    try:
+        return datetime.date(year, month, day).isoformat() + "T00:00:00Z"
+    except ValueError:
+        return None
+
+
+def parse_amount(value):
+    """"54,000,000" → 54000000 (Edm.Int64), 비어 있거나 숫자가 아니면 None"""
+    digits = (value or "").replace(",", "").strip()
+    return int(digits) if re.fullmatch(r"-?\d+", digits) else None
+
+
+def to_index_document(record):
+    """project-history-index 업로드 문서 생성 (필터/패싯용 메타데이터는 타입 변환)"""
+    return {
+        "@search.action": "mergeOrUpload",
+        "id": record["id"],
+        "department": record["department"],
+        "project_name": record["project_name"],
+        "summary_text": record["summary_text"],
+        "portfolio": record.get("portfolio") or None,
+        "client": record.get("client") or None,
+        "start_date": parse_date(record.get("start_date")),
+        "end_date": parse_date(record.get("end_date")),
+        "contract_amount": parse_amount(record.get("contract_amount")),
+        "embedding": record["embedding"]
+    }
+
+
+def upgrade_legacy_records(records):
+    """행 위치 기반 ID(proj-00001)를 쓰던 기존 레코드에 내용 기반 ID와 content_hash 부여"""
+    assign_id = ProjectIdAssigner()
+    for record in records:
+        record["id"] = assign_id.for_record(record)
+        record["content_hash"] = record_hash(record)
+        yield record
+
+
+def record_hash(record):
+    """임베딩/인덱스 반영 여부를 판단하는 레코드 내용 해시"""
+    payload = {k: v for k, v in record.items() if k not in ("content_hash", "embedding")}
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:32]
+
+
+def load_manifest(path=DEFAULT_MANIFEST_PATH):
+    """{id: content_hash} 매니페스트 로드 (없으면 빈 dict)"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=DEFAULT_MANIFEST_PATH):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=0, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def change_type(record, manifest):
+    """이전 매니페스트 대비 레코드 상태 ("added" / "changed" / "unchanged")"""
+    previous = manifest.get(record["id"])
+    if previous is None:
+        return "added"
+    if previous != record["content_hash"]:
+        return "changed"
+    return "unchanged"
+
+
+def next_manifest(manifest, seen_hashes, deleted_ids, failed_ids):
+    """업로드 결과 반영 매니페스트 (실패한 문서는 이전 상태를 유지해 다음 실행에서 재시도)"""
+    updated = {}
+    for doc_id, content_hash in seen_hashes.items():
+        if doc_id not in failed_ids:
+            updated[doc_id] = content_hash
+        elif doc_id in manifest:
+            updated[doc_id] = manifest[doc_id]
+    for doc_id in deleted_ids:
+        if doc_id in failed_ids:
+            updated[doc_id] = manifest[doc_id]
+    return updated
+
+
+def sync_history_index(records, writer, manifest, embed_stream=None):
+    """레코드 스트림 중 변경분만 인덱스에 반영 → (새 매니페스트, 상태별 건수)
+
+    미변경 레코드는 embed_stream 에 넘기지 않으므로 임베딩도 생성되지 않는다.
+    """
+    seen_hashes = {}
+    counts = Counter()
+
+    def changed_records():
+        for record in records:
+            seen_hashes[record["id"]] = record["content_hash"]
+            kind = change_type(record, manifest)
+            counts[kind] += 1
+            if kind != "unchanged":
+                yield record
+
+    stream = changed_records()
+    if embed_stream is not None:
+        stream = embed_stream(stream)
+    for record in stream:
+        writer.add(to_index_document(record))
+
+    deleted_ids = [doc_id for doc_id in manifest if doc_id not in seen_hashes]
+    for doc_id in deleted_ids:
+        writer.add({"@search.action": "delete", "id": doc_id})
+    writer.flush()
+    counts["deleted"] = len(deleted_ids)
+
+    return next_manifest(manifest, seen_hashes, deleted_ids, writer.failed_keys), counts
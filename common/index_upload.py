@@ -0,0 +1,156 @@
+import json
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+# ✅ Azure AI Search 인덱싱 요청 한도: 요청당 최대 1000건 / 16MB
+DEFAULT_MAX_BATCH_BYTES = 8 * 1024 * 1024
+DEFAULT_MAX_BATCH_DOCS = 1000
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_RETRIES = 3
+
+# 문서 단위로 재시도할 상태 코드 (충돌/일시적 오류), 400 등은 문서 자체 문제이므로 재시도하지 않음
+RETRYABLE_STATUS_CODES = {409, 422, 429, 500, 503}
+
+
+class IndexBatchWriter:
+    """Azure AI Search 병렬 배치 업로더
+
+    - 문서 개수가 아닌 payload 크기 기준으로 배치를 나눈다 (1536차원 embedding 은 문서당 ~30KB)
+    - 여러 배치를 동시에 전송하되, 전송 대기 배치 수를 제한해 메모리 사용량을 일정하게 유지한다
+    - 문서별 결과를 확인해 실패한 키만 재시도한다
+    """
+
+    def __init__(self, search_client, index_name, max_batch_bytes=DEFAULT_MAX_BATCH_BYTES,
+                 max_batch_docs=DEFAULT_MAX_BATCH_DOCS, max_workers=DEFAULT_MAX_WORKERS,
+                 max_retries=DEFAULT_MAX_RETRIES, key_field="id"):
+        self.search_client = search_client
+        self.index_name = index_name
+        self.max_batch_bytes = max_batch_bytes
+        self.max_batch_docs = max_batch_docs
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.key_field = key_field
+
+        self.batch_count = 0
+        self.succeeded = 0
+        self.failed_keys = set()
+        self.errors = {}
+        self.started_at = time.perf_counter()
+
+        self._pending = []
+        self._pending_bytes = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._in_flight = set()
+
+    def add(self, doc):
+        size = len(json.dumps(doc, ensure_ascii=False).encode("utf-8"))
+        if self._pending and (self._pending_bytes + size > self.max_batch_bytes
+                              or len(self._pending) >= self.max_batch_docs):
+            self._submit()
+        self._pending.append(doc)
+        self._pending_bytes += size
+
+    def _submit(self):
+        batch, self._pending, self._pending_bytes = self._pending, [], 0
+        self.batch_count += 1
+        # 전송 대기 배치가 너무 많으면 하나가 끝날 때까지 기다림 (backpressure)
+        while len(self._in_flight) >= self.max_workers * 2:
+            done, self._in_flight = wait(self._in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()
+        self._in_flight.add(self._executor.submit(self._send, self.batch_count, batch))
+
+    def flush(self):
+        """대기 중인 문서를 모두 전송하고 완료까지 기다림"""
+        if self._pending:
+            self._submit()
+        results = wait(self._in_flight)
+        self._in_flight = set()
+        for future in results.done:
+            future.result()
+
+    def _send(self, batch_no, batch):
+        for attempt in range(self.max_retries + 1):
+            retry_docs, error = self._post(batch_no, batch)
+            if not retry_docs:
+                return
+            if attempt < self.max_retries:
+                wait_seconds = min(30.0, 2 ** attempt) + random.uniform(0, 1)
+                print(f"Batch {batch_no} → {len(retry_docs)}건 재시도 {attempt + 1}/{self.max_retries} ({wait_seconds:.1f}초 후)")
+                time.sleep(wait_seconds)
+                batch = retry_docs
+
+        self._record_failures(retry_docs, error)
+
+    def _post(self, batch_no, batch):
+        """배치 전송 → (재시도할 문서 목록, 마지막 오류 메시지)"""
+        try:
+            response = self.search_client.index_documents(self.index_name, batch)
+        except requests.RequestException as e:
+            print(f"Batch {batch_no} ({len(batch)}건) → 요청 실패: {e}")
+            return batch, str(e)
+
+        if response.status_code not in (200, 207):
+            print(f"Batch {batch_no} ({len(batch)}건) → Status: {response.status_code}")
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                return batch, response.text
+            self._record_failures(batch, response.text)
+            return [], None
+
+        docs_by_key = {doc[self.key_field]: doc for doc in batch}
+        retry_docs = []
+        succeeded = 0
+        last_error = None
+        permanent = []
+        for result in response.json().get("value", []):
+            if result.get("status"):
+                succeeded += 1
+                continue
+            last_error = f"{result.get('statusCode')} {result.get('errorMessage')}"
+            doc = docs_by_key[result.get("key")]
+            if result.get("statusCode") in RETRYABLE_STATUS_CODES:
+                retry_docs.append(doc)
+            else:
+                permanent.append(doc)
+
+        with self._lock:
+            self.succeeded += succeeded
+        self._record_failures(permanent, last_error)
+
+        failed = len(batch) - succeeded
+        print(f"Batch {batch_no} ({len(batch)}건) → Status: {response.status_code}, 성공 {succeeded}건"
+              + (f", 실패 {failed}건" if failed else ""))
+        return retry_docs, last_error
+
+    def _record_failures(self, docs, error):
+        with self._lock:
+            for doc in docs:
+                self.failed_keys.add(doc[self.key_field])
+                self.errors[doc[self.key_field]] = error
+
+    def close(self):
+        self.flush()
+        self._executor.shutdown()
+
+    def print_summary(self):
+        elapsed = time.perf_counter() - self.started_at
+        print(f"📊 업로드 {self.succeeded}건 성공 / {len(self.failed_keys)}건 실패 / "
+              f"배치 {self.batch_count}개 / {elapsed:.1f}초 ({self.succeeded / max(elapsed, 1e-9):.1f} docs/sec)")
+        for key in sorted(self.failed_keys)[:20]:
+            print(f"  ⚠️ {key}: {self.errors.get(key)}")
+        if len(self.failed_keys) > 20:
+            print(f"  ... 외 {len(self.failed_keys) - 20}건")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._executor.shutdown(wait=False, cancel_futures=True)
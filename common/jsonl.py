@@ -0,0 +1,43 @@
+import json
+import os
+
+
+def read_jsonl(path):
+    """JSONL 파일을 한 줄씩 읽어 dict 로 반환 (전체를 메모리에 올리지 않음)"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+class JsonlWriter:
+    """JSONL 파일 스트리밍 저장 (완료 시 원자적으로 교체)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._tmp_path = f"{path}.tmp"
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(self._tmp_path, "w", encoding="utf-8")
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write("\n")
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # 실패 시 기존 결과 파일은 그대로 둔다
+            self._file.close()
+            os.remove(self._tmp_path)
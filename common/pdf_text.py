@@ -0,0 +1,210 @@
+import io
+import math
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import fitz  # PyMuPDF
+import PyPDF2
+
+# ✅ 페이지 수가 적은 문서는 프로세스 전송 비용이 더 크므로 현재 프로세스에서 바로 추출
+DEFAULT_MIN_PARALLEL_PAGES = 16
+DEFAULT_MIN_PAGES_PER_TASK = 8
+
+# ✅ 프로세스 시작 방식: 오프라인 스크립트는 fork(빠른 시작), 멀티스레드 서버(Streamlit 앱)는 forkserver
+#    (스레드가 잡고 있던 락(logging, urllib3 풀 등)이 fork 된 자식에 복사되어 교착될 수 있음)
+DEFAULT_START_METHOD = "fork"
+SERVER_START_METHOD = "forkserver"
+
+_executors = {}
+_executor_lock = threading.Lock()
+
+
+def _open_fitz(source):
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+
+def _open_pypdf2(source):
+    if isinstance(source, (bytes, bytearray)):
+        return PyPDF2.PdfReader(io.BytesIO(source))
+    return PyPDF2.PdfReader(source)
+
+
+def _extract_range(source, start, end):
+    """페이지 구간 [start, end) 추출 (프로세스 풀 작업 단위)
+
+    PyMuPDF 결과가 비어 있거나 실패한 페이지만 PyPDF2 로 다시 추출한다.
+    """
+    results = []
+    reader = None
+    with _open_fitz(source) as doc:
+        for page_no in range(start, end):
+            started = time.perf_counter()
+            method = "pymupdf"
+            try:
+                text = doc.load_page(page_no).get_text()
+            except Exception:
+                text = ""
+
+            if not text.strip():
+                method = "pypdf2"
+                try:
+                    if reader is None:
+                        reader = _open_pypdf2(source)
+                    text = reader.pages[page_no].extract_text() or ""
+                except Exception:
+                    text = ""
+                if not text.strip():
+                    # 이미지만 있는 페이지 (OCR 필요)
+                    method = "empty"
+
+            results.append({
+                "page": page_no + 1,
+                "text": text,
+                "chars": len(text),
+                "seconds": time.perf_counter() - started,
+                "method": method
+            })
+    return results
+
+
+def _get_executor(max_workers, start_method=DEFAULT_START_METHOD):
+    """시작 방식별 프로세스 풀은 한 번 만들어 재사용 (문서마다 워커를 띄우지 않음)
+
+    해당 시작 방식을 지원하지 않는 환경(Windows)에서는 스크립트 재실행 문제를 피하기 위해 스레드 풀을 사용한다.
+    """
+    with _executor_lock:
+        executor = _executors.get(start_method)
+        if executor is None:
+            if start_method in multiprocessing.get_all_start_methods():
+                executor = ProcessPoolExecutor(max_workers=max_workers,
+                                               mp_context=multiprocessing.get_context(start_method))
+            else:
+                executor = ThreadPoolExecutor(max_workers=max_workers)
+            _executors[start_method] = executor
+        return executor
+
+
+def _discard_executor(start_method, executor):
+    """워커가 비정상 종료된(BrokenProcessPool) 풀을 버려 다음 호출에서 새로 만들도록 함"""
+    with _executor_lock:
+        if _executors.get(start_method) is executor:
+            del _executors[start_method]
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _page_ranges(page_count, n_tasks):
+    size = math.ceil(page_count / n_tasks)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def _extract_ranges(path, ranges, max_workers, start_method):
+    """페이지 구간들을 프로세스 풀에서 추출 (풀이 깨져 있으면 새 풀로 한 번 재시도)"""
+    for attempt in range(2):
+        executor = _get_executor(max_workers, start_method)
+        try:
+            futures = [executor.submit(_extract_range, path, start, end) for start, end in ranges]
+            return [page for future in futures for page in future.result()]
+        except BrokenProcessPool:
+            _discard_executor(start_method, executor)
+            if attempt:
+                raise
+            print("[WARN] PDF 추출 워커가 비정상 종료되어 프로세스 풀을 다시 만듭니다.")
+
+
+def extract_pdf_pages(source, max_workers=None, min_parallel_pages=DEFAULT_MIN_PARALLEL_PAGES,
+                      start_method=DEFAULT_START_METHOD):
+    """PDF(파일 경로 또는 bytes) → 페이지별 결과 목록 [{page, text, chars, seconds, method}]"""
+    with _open_fitz(source) as doc:
+        page_count = doc.page_count
+    if page_count == 0:
+        return []
+
+    max_workers = max_workers or int(os.getenv("PDF_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+    if max_workers <= 1 or page_count < min_parallel_pages:
+        return _extract_range(source, 0, page_count)
+
+    n_tasks = max(1, min(max_workers * 2, page_count // DEFAULT_MIN_PAGES_PER_TASK))
+    ranges = _page_ranges(page_count, n_tasks)
+    if not isinstance(source, (bytes, bytearray)):
+        return _extract_ranges(source, ranges, max_workers, start_method)
+
+    # bytes 는 작업마다 직렬화되어 전송되므로 임시 파일에 한 번 쓰고 경로만 전달
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(source)
+    try:
+        return _extract_ranges(f.name, ranges, max_workers, start_method)
+    finally:
+        os.remove(f.name)
+
+
+def page_report(pages, elapsed=None):
+    """페이지별 추출 통계 (텍스트 제외)"""
+    return {
+        "pages": len(pages),
+        "chars": sum(page["chars"] for page in pages),
+        "page_seconds": sum(page["seconds"] for page in pages),
+        "elapsed": elapsed,
+        "fallback_pages": [page["page"] for page in pages if page["method"] == "pypdf2"],
+        "empty_pages": [page["page"] for page in pages if page["method"] == "empty"],
+        "page_stats": [
+            {"page": page["page"], "chars": page["chars"], "seconds": page["seconds"], "method": page["method"]}
+            for page in pages
+        ]
+    }
+
+
+def extract_pdf_text(source, max_workers=None, min_parallel_pages=DEFAULT_MIN_PARALLEL_PAGES,
+                     start_method=DEFAULT_START_METHOD):
+    """PDF → (전체 텍스트, 추출 통계), 페이지 텍스트는 목록에 모아 한 번에 join"""
+    started = time.perf_counter()
+    pages = extract_pdf_pages(source, max_workers=max_workers, min_parallel_pages=min_parallel_pages,
+                              start_method=start_method)
+    text = "\n".join(page["text"] for page in pages)
+    return text, page_report(pages, time.perf_counter() - started)
+
+
+def _extract_file(path):
+    # 문서 단위 병렬 처리 시 워커 안에서는 페이지 병렬화를 하지 않음
+    return extract_pdf_text(path, max_workers=1)
+
+
+def extract_pdf_files(paths, max_workers=None):
+    """여러 PDF 파일을 프로세스 풀에서 문서 단위로 동시에 추출 → 완료 순서대로 (경로, 텍스트, 추출 통계)"""
+    paths = list(paths)
+    if not paths:
+        return
+    max_workers = max_workers or int(os.getenv("PDF_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+    if max_workers <= 1 or len(paths) == 1:
+        for path in paths:
+            yield (path,) + _extract_file(path)
+        return
+
+    executor = _get_executor(max_workers)
+    futures = {executor.submit(_extract_file, path): path for path in paths}
+    try:
+        for future in as_completed(futures):
+            yield (futures[future],) + future.result()
+    except BrokenProcessPool:
+        _discard_executor(DEFAULT_START_METHOD, executor)
+        raise
+
+
+def format_report(report, slowest=3):
+    """추출 통계 한 줄 요약 (로그 출력용)"""
+    line = (f"{report['pages']}페이지 / {report['chars']}자 / {report['elapsed'] or 0:.2f}초 "
+            f"(페이지 합계 {report['page_seconds']:.2f}초)")
+    if report["fallback_pages"]:
+        line += f" / PyPDF2 대체 {len(report['fallback_pages'])}페이지"
+    if report["empty_pages"]:
+        line += f" / 텍스트 없음 {report['empty_pages']}"
+    slow = sorted(report["page_stats"], key=lambda page: page["seconds"], reverse=True)[:slowest]
+    if slow:
+        line += " / 느린 페이지 " + ", ".join(f"p{page['page']} {page['seconds'] * 1000:.0f}ms" for page in slow)
+    return line
@@ -0,0 +1,106 @@
+import math
+import re
+import threading
+
+try:
+    import tiktoken
+except ImportError:  # 설치되지 않은 환경에서는 글자 수 기반 추정 사용
+    tiktoken = None
+
+# ✅ gpt-4.1 / gpt-4o 계열 토크나이저
+DEFAULT_ENCODING = "o200k_base"
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+# 문장 경계: 마침표/물음표/느낌표(+닫는 괄호·따옴표) 뒤 공백, 또는 줄바꿈
+_SENTENCE_PATTERN = re.compile(r"(?<=[.!?。])[\"')\]]*\s+|\n+")
+
+
+def _get_encoder():
+    """tiktoken 인코더 (처음 사용 시 BPE 파일을 내려받으므로, 받을 수 없으면 추정치로 대체하고 다시 시도하지 않음)"""
+    if tiktoken is None:
+        return None
+    with _encoder_lock:
+        if _encoder is None:
+            _load_encoder()
+    return _encoder or None
+
+
+def _load_encoder():
+    global _encoder
+    for encoding in (DEFAULT_ENCODING, "cl100k_base"):
+        try:
+            _encoder = tiktoken.get_encoding(encoding)
+            return
+        except Exception as e:
+            print(f"[WARN] tiktoken 인코딩({encoding}) 로드 실패: {e}")
+    print("[WARN] 토큰 수를 글자 수 기반 추정치로 계산합니다. (TIKTOKEN_CACHE_DIR 에 BPE 파일을 두면 오프라인에서도 사용 가능)")
+    _encoder = False
+
+
+def count_tokens(text):
+    """로컬 토큰 수 계산 (tiktoken 이 없으면 ASCII 4자당 1토큰, 한글 등은 1자당 1토큰으로 보수적 추정)"""
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+def split_sentences(text):
+    return [sentence.strip() for sentence in _SENTENCE_PATTERN.split(text or "") if sentence.strip()]
+
+
+def truncate_to_tokens(text, max_tokens):
+    """max_tokens 이내로 문장 단위 절단 (첫 문장도 넘치면 단어 단위로 자르고 … 표시)"""
+    if max_tokens <= 0 or not text:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    kept = []
+    used = 0
+    for sentence in split_sentences(text):
+        tokens = count_tokens(sentence) + (1 if kept else 0)
+        if used + tokens > max_tokens:
+            break
+        kept.append(sentence)
+        used += tokens
+    if kept:
+        return " ".join(kept)
+
+    words = []
+    for word in text.split():
+        if count_tokens(" ".join(words + [word]) + " …") > max_tokens:
+            break
+        words.append(word)
+    return " ".join(words) + " …" if words else ""
+
+
+def fill_budget(items, render, budget, item_tokens=None):
+    """관련도 순으로 정렬된 항목을 앞에서부터 토큰 예산 안에서 채움
+
+    render(item) 는 (항목 헤더, 본문) 을 반환하고, 본문은 남은 예산(또는 item_tokens)에 맞춰 문장 단위로 자른다.
+    헤더조차 들어가지 않는 항목은 건너뛴다.
+    → (선택된 (항목, 렌더링 텍스트) 목록, 사용 토큰 수)
+    """
+    selected = []
+    used = 0
+    for item in items:
+        header, detail = render(item)
+        header_tokens = count_tokens(header)
+        remaining = budget - used - header_tokens
+        if remaining < 0:
+            continue
+        detail_budget = min(remaining, item_tokens) if item_tokens else remaining
+        detail = truncate_to_tokens(detail, detail_budget)
+        text = header + detail
+        tokens = count_tokens(text)
+        if used + tokens > budget:
+            continue
+        selected.append((item, text))
+        used += tokens
+    return selected, used
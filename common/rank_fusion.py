@@ -0,0 +1,44 @@
+# ✅ Reciprocal Rank Fusion: 점수 스케일이 다른 여러 순위 목록을 순위만으로 합침 (Azure AI Search 하이브리드와 같은 k=60)
+DEFAULT_RRF_K = 60
+# RRF 로 결합된 결과 표시 (@search.score 가 코사인 유사도가 아니라 순위에서 나온 작은 값(≈1/(k+순위))이므로 %로 표시하지 않음)
+SCORE_TYPE_FIELD = "@search.scoreType"
+RRF_SCORE = "rrf"
+
+
+def reciprocal_rank_fusion(rankings, k=DEFAULT_RRF_K, weights=None):
+    """순위 목록들(각각 키 목록, 관련도 내림차순) → [(키, RRF 점수)] 점수 내림차순
+
+    점수가 같으면 앞쪽 목록에서 먼저(높은 순위로) 등장한 키가 앞에 온다.
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores = {}
+    first_seen = {}
+    for list_no, (ranking, weight) in enumerate(zip(rankings, weights)):
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + weight / (k + rank)
+            first_seen.setdefault(key, (list_no, rank))
+    return sorted(scores.items(), key=lambda item: (-item[1], first_seen[item[0]]))
+
+
+def fuse_result_lists(result_lists, weights=None, labels=None, top_k=None, k=DEFAULT_RRF_K, key="id"):
+    """질의별 검색 결과(문서 목록, 관련도 내림차순) → 가중 RRF 로 합친 문서 목록
+
+    각 문서의 @search.score 는 RRF 점수로 바뀌고(@search.scoreType="rrf"), labels 가 주어지면 matched_queries 에
+    그 문서를 찾은 질의 라벨과 해당 질의에서의 순위가 기록된다.
+    """
+    labels = labels or [None] * len(result_lists)
+    documents = {}
+    matched = {}
+    for results, label in zip(result_lists, labels):
+        for rank, doc in enumerate(results, start=1):
+            documents.setdefault(doc[key], doc)
+            if label is not None:
+                matched.setdefault(doc[key], []).append({"query": label, "rank": rank})
+    fused = reciprocal_rank_fusion([[doc[key] for doc in results] for results in result_lists], k=k, weights=weights)
+    if top_k is not None:
+        fused = fused[:top_k]
+    return [
+        {**documents[doc_key], "@search.score": score, SCORE_TYPE_FIELD: RRF_SCORE,
+         "matched_queries": matched.get(doc_key, [])}
+        for doc_key, score in fused
+    ]
@@ -0,0 +1,163 @@
+import math
+import re
+import time
+import unicodedata
+from collections import Counter
+from datetime import date
+
+import numpy as np
+
+from common.bm25 import tokenize
+
+# ✅ 프로젝트 이력 재순위화 (LLM / GPU 없이 CPU 에서 수 ms 안에 끝나는 특징 기반 선형 모델)
+#    1차 검색 순위 + 질의어 겹침 + 고객사 일치 + 포트폴리오 일치 + 최신성 + 계약금액 유사도
+DEFAULT_WEIGHTS = {
+    "first_stage": 1.0,
+    "terms": 0.8,
+    "client": 0.5,
+    "portfolio": 0.2,
+    "recency": 0.2,
+    "amount": 0.2
+}
+# 비용이 낮은 특징부터 계산하고, 예산을 넘기면 남은 특징은 건너뜀
+FEATURE_ORDER = ("first_stage", "client", "portfolio", "recency", "amount", "terms")
+
+DEFAULT_CANDIDATES = 50
+DEFAULT_BUDGET_MS = 50.0
+# 종료일 기준 최신성 반감기 (년)
+RECENCY_HALF_LIFE_YEARS = 3.0
+# 질의 포트폴리오가 없으면 1차 검색 상위 후보들의 다수 포트폴리오를 사용
+PORTFOLIO_VOTE_TOP = 10
+
+_CORPORATE_PATTERN = re.compile(r"주식회사|\(주\)|㈜|\s+")
+_BUDGET_PATTERN = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*(억|천만|백만|만)?")
+# 단위가 붙은 금액 하나 ("5억", "5억 3천만", "1억 2,500만")
+_UNIT_AMOUNT_PATTERN = re.compile(r"\d[\d,]*(?:\.\d+)?\s*(?:억|천만|백만|만)(?:\s*\d[\d,]*(?:\.\d+)?\s*(?:천만|백만|만))*")
+_BUDGET_UNITS = {"억": 100_000_000, "천만": 10_000_000, "백만": 1_000_000, "만": 10_000, "": 1}
+
+
+def normalize_client(name):
+    """고객사명 비교용 정규화 ("주식회사 케이티" / "(주)케이티" → "케이티")"""
+    return _CORPORATE_PATTERN.sub("", unicodedata.normalize("NFKC", name or "")).lower()
+
+
+def parse_budget(text):
+    """과업예산 문자열 → 원 단위 금액 ("금 5억 3천만원" → 530000000, "500,000,000원" → 500000000)
+
+    금액이 여러 개면 가장 큰 금액 (총액 뒤에 연차별 내역이 붙은 "5억원(1차년도 2억, 2차년도 3억)" → 500000000)
+    """
+    unit_amounts = [
+        sum(float(number.replace(",", "")) * _BUDGET_UNITS[unit] for number, unit in _BUDGET_PATTERN.findall(amount))
+        for amount in _UNIT_AMOUNT_PATTERN.findall(text or "")
+    ]
+    if unit_amounts:
+        return int(max(unit_amounts))
+    # 단위가 없으면 금액으로 볼 수 있는 가장 큰 숫자 (연도 등 작은 숫자 제외)
+    amounts = [float(number.replace(",", "")) for number, _ in _BUDGET_PATTERN.findall(text or "")]
+    amounts = [amount for amount in amounts if amount >= 100_000]
+    return int(max(amounts)) if amounts else None
+
+
+def _first_stage(candidates, query):
+    # 점수 스케일이 모드(코사인 / RRF)마다 다르므로 순위 기반으로 0~1 변환
+    n = len(candidates)
+    return 1.0 - np.arange(n, dtype=np.float32) / n
+
+
+def _client(candidates, query):
+    target = normalize_client(query.get("client"))
+    if not target:
+        return None
+    # 부분 일치는 계열사("케이티" / "케이티알파")를 같은 고객으로 보므로 정규화 후 완전 일치만 인정
+    return np.array([normalize_client(doc.get("client")) == target for doc in candidates], dtype=np.float32)
+
+
+def _portfolio(candidates, query):
+    target = query.get("portfolio")
+    if not target:
+        votes = Counter(doc.get("portfolio") for doc in candidates[:PORTFOLIO_VOTE_TOP] if doc.get("portfolio"))
+        if not votes:
+            return None
+        target = votes.most_common(1)[0][0]
+    targets = set(target) if isinstance(target, (list, tuple, set)) else {target}
+    return np.array([doc.get("portfolio") in targets for doc in candidates], dtype=np.float32)
+
+
+def _recency(candidates, query):
+    today = np.datetime64(query.get("today") or date.today(), "D")
+    end_dates = np.array([(doc.get("end_date") or "")[:10] or "NaT" for doc in candidates], dtype="datetime64[D]")
+    known = ~np.isnat(end_dates)
+    if not known.any():
+        return None
+    age_years = np.maximum((today - end_dates[known]).astype(np.float32) / 365.25, 0.0)
+    values = np.zeros(len(candidates), dtype=np.float32)
+    values[known] = np.exp2(-age_years / RECENCY_HALF_LIFE_YEARS)
+    return values
+
+
+def _amount(candidates, query):
+    budget = query.get("budget")
+    if not budget:
+        return None
+    amounts = np.array([doc.get("contract_amount") or 0 for doc in candidates], dtype=np.float64)
+    values = np.zeros(len(candidates), dtype=np.float32)
+    known = amounts > 0
+    # 금액 비율 (작은 쪽 / 큰 쪽): 같으면 1, 10배 차이면 0.1
+    values[known] = np.minimum(amounts[known], budget) / np.maximum(amounts[known], budget)
+    return values
+
+
+def _terms(candidates, query):
+    query_terms = set(tokenize(query.get("text")))
+    if not query_terms:
+        return None
+    doc_terms = [set(tokenize(f"{doc.get('project_name', '')} {doc.get('summary_text', '')}")) for doc in candidates]
+    # 후보 집합 안에서의 idf 가중 질의어 적중률 (흔한 "유지보수", "개발" 보다 고유 명칭 일치에 가중)
+    df = Counter(term for terms in doc_terms for term in terms & query_terms)
+    n = len(candidates)
+    idf = {term: math.log(1 + n / (df[term] + 0.5)) for term in query_terms}
+    total = sum(idf.values())
+    return np.array([sum(idf[term] for term in terms & query_terms) / total for terms in doc_terms],
+                    dtype=np.float32)
+
+
+_FEATURES = {
+    "first_stage": _first_stage,
+    "client": _client,
+    "portfolio": _portfolio,
+    "recency": _recency,
+    "amount": _amount,
+    "terms": _terms
+}
+
+
+def rerank(candidates, query, top_k, weights=None, budget_ms=DEFAULT_BUDGET_MS):
+    """1차 검색 후보(관련도 내림차순) → 특징 점수 가중합으로 재정렬한 상위 top_k
+
+    query: {"text": 키워드 질의, "client": 발주처, "portfolio": 포트폴리오(선택), "budget": 과업예산(원), "today": date(선택)}
+    값이 없는 특징은 모든 후보에 같은 영향이므로 건너뛴다. 특징 계산이 budget_ms 를 넘기면 남은 특징을 생략한다.
+    → (재정렬된 문서 목록(@rerank.score 추가), 통계 {"ms", "candidates", "features", "skipped"})
+    """
+    started = time.perf_counter()
+    weights = weights or DEFAULT_WEIGHTS
+    candidates = list(candidates)
+    stats = {"ms": 0.0, "candidates": len(candidates), "features": [], "skipped": []}
+    if not candidates:
+        return [], stats
+
+    scores = np.zeros(len(candidates), dtype=np.float32)
+    for name in FEATURE_ORDER:
+        if not weights.get(name):
+            continue
+        if (time.perf_counter() - started) * 1000 > budget_ms:
+            stats["skipped"].append(name)
+            continue
+        values = _FEATURES[name](candidates, query)
+        if values is not None:
+            scores += weights[name] * values
+            stats["features"].append(name)
+
+    # 점수가 같으면 1차 검색 순서 유지
+    order = np.argsort(-scores, kind="stable")[:top_k]
+    stats["ms"] = (time.perf_counter() - started) * 1000
+    return [{**candidates[i], "@rerank.score": float(scores[i])} for i in order], stats
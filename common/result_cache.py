@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from common.embedding_cache import normalize_text
+
+
+def content_key(text, *versions):
+    """문서 내용 + 모델/프롬프트 버전 기반 캐시 키"""
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8"))
+    for version in versions:
+        digest.update(b"\x1f")
+        digest.update(str(version).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """TTL + LRU 메모리 캐시 (선택적으로 로컬 디스크에 JSON 으로 보관)
+
+    서버 프로세스에서 하나를 만들어 모든 세션이 공유한다.
+    """
+
+    def __init__(self, max_entries=128, ttl_seconds=24 * 3600, persist_dir=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist_dir = persist_dir
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if persist_dir:
+            os.makedirs(persist_dir, exist_ok=True)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._load(key)
+                if entry is not None:
+                    self._entries[key] = entry
+            if entry is not None and entry["stored_at"] + self.ttl_seconds < now:
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._evict()
+            if self.persist_dir and os.path.exists(self._path(key)):
+                os.utime(self._path(key))
+            self.hits += 1
+            return entry["value"]
+
+    def put(self, key, value):
+        entry = {"stored_at": time.time(), "value": value}
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+            if self.persist_dir:
+                path = self._path(key)
+                with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                    json.dump(entry, f, ensure_ascii=False)
+                os.replace(f"{path}.tmp", path)
+                self._evict_disk()
+
+    def _path(self, key):
+        return os.path.join(self.persist_dir, f"{key}.json")
+
+    def _load(self, key):
+        if not self.persist_dir or not os.path.exists(self._path(key)):
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        if self.persist_dir and os.path.exists(self._path(key)):
+            os.remove(self._path(key))
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _evict_disk(self):
+        """디스크에도 max_entries 개까지만 보관 (오래된 파일부터 삭제)"""
+        files = [
+            os.path.join(self.persist_dir, name)
+            for name in os.listdir(self.persist_dir)
+            if name.endswith(".json")
+        ]
+        if len(files) <= self.max_entries:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - self.max_entries]:
+            os.remove(path)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries)
+        }
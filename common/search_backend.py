@@ -0,0 +1,238 @@
+import os
+import threading
+
+import numpy as np
+
+from common import history, solution
+from common.ann_index import DEFAULT_NPROBE, IVFIndex, ann_path, store_fingerprint
+from common.bm25 import BM25Index
+from common.rank_fusion import RRF_SCORE, SCORE_TYPE_FIELD, reciprocal_rank_fusion
+from common.search_filters import FilterColumns, to_odata
+from common.search_client import create_search_client
+from common.vector_store import VectorStore
+
+PROJECT_INDEX = "project-history-index"
+SOLUTION_INDEX = "solution-embedding-index"
+SOLUTION_PASSAGE_INDEX = "solution-passage-index"
+
+# ✅ 로컬 백엔드: 인덱스 이름 → (벡터 저장소 prefix, 업로드 문서 변환 함수)
+LOCAL_INDEXES = {
+    PROJECT_INDEX: ("enriched_project_history", history.to_index_document),
+    SOLUTION_INDEX: ("enriched_solution", solution.to_index_document),
+    SOLUTION_PASSAGE_INDEX: ("solution_passages", solution.to_passage_document),
+}
+DEFAULT_LOCAL_DIR = "data/preprocess_results"
+
+# ✅ 하이브리드 검색에서 키워드 질의를 적용할 텍스트 필드
+TEXT_FIELDS = {
+    PROJECT_INDEX: ("project_name", "summary_text"),
+    SOLUTION_INDEX: ("name", "description"),
+    SOLUTION_PASSAGE_INDEX: ("name", "text"),
+}
+
+# 검색 모드: vector(벡터만) / hybrid(키워드 + 벡터, RRF 결합)
+SEARCH_MODES = ("vector", "hybrid")
+# 하이브리드 결합 전 각 순위 목록에서 가져올 후보 수 (top_k 의 배수, 최소값)
+HYBRID_CANDIDATE_FACTOR = 5
+HYBRID_MIN_CANDIDATES = 50
+
+
+# Azure simple query 문법의 연산자 문자 (과업명에 들어간 "-", "(" 등이 연산자로 해석되지 않도록 공백 처리)
+_QUERY_OPERATORS = str.maketrans({ch: " " for ch in '+-&|!(){}[]^"~*?:\\/'})
+
+
+class AzureSearchBackend:
+    """Azure AI Search REST 벡터/하이브리드 검색 (공유 SearchClient 커넥션 풀 사용)
+
+    하이브리드 모드는 Azure 의 기본 하이브리드 검색(키워드 + 벡터, 서버 측 RRF)을 사용한다.
+    """
+
+    name = "azure"
+
+    def __init__(self, search_client, mode="vector"):
+        self.search_client = search_client
+        self.mode = mode
+
+    def search(self, index_name, query_embedding, top_k, timeout=None, query_text=None, filters=None,
+               include_vectors=False):
+        # include_vectors: embedding 필드가 retrievable 이면 결과에 포함되므로 별도 처리 없음 (인터페이스 호환용)
+        search_body = {
+            "search": "*",
+            "vectorQueries": [
+                {
+                    "kind": "vector",
+                    "vector": query_embedding,
+                    "fields": "embedding",
+                    "k": top_k
+                }
+            ]
+        }
+        hybrid = self.mode == "hybrid" and bool(query_text)
+        if hybrid:
+            search_body.update({
+                "search": " ".join(query_text.translate(_QUERY_OPERATORS).split()),
+                "searchFields": ",".join(TEXT_FIELDS[index_name]),
+                "top": top_k
+            })
+            search_body["vectorQueries"][0]["k"] = max(top_k * HYBRID_CANDIDATE_FACTOR, HYBRID_MIN_CANDIDATES)
+        if filters:
+            # 필터를 벡터 탐색 전에 적용 (preFilter: 조건에 맞는 문서 중에서 top-k)
+            search_body["filter"] = to_odata(filters)
+            search_body["vectorFilterMode"] = "preFilter"
+        results = self.search_client.search(index_name, search_body, timeout=timeout).get("value", [])
+        if hybrid:
+            # 하이브리드 검색의 @search.score 는 서버 측 RRF 점수
+            results = [{**doc, SCORE_TYPE_FIELD: RRF_SCORE} for doc in results]
+        return results
+
+    def facets(self, index_name, fields, count=50, timeout=None):
+        """필드 값별 문서 수 → {필드: [(값, 건수)]}"""
+        search_body = {"search": "*", "facets": [f"{field},count:{count}" for field in fields], "top": 0}
+        response = self.search_client.search(index_name, search_body, timeout=timeout)
+        return {
+            field: [(facet["value"], facet["count"]) for facet in response.get("@search.facets", {}).get(field, [])]
+            for field in fields
+        }
+
+
+class LocalIndex:
+    """정규화된 float32 행렬 + 문서 목록 (프로세스당 1회 로드)
+
+    벡터 저장소 옆에 IVF 인덱스({prefix}.ivf.npz)가 있으면 근사 탐색을 사용한다.
+    """
+
+    def __init__(self, prefix, to_document, use_ann=True, nprobe=DEFAULT_NPROBE, text_fields=None):
+        store = VectorStore(prefix)
+        vectors = np.asarray(store.vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.matrix = vectors / np.maximum(norms, 1e-12)
+        self.documents = []
+        for record in store.iter_metadata():
+            # Azure 인덱스에 업로드되는 필드와 동일한 형태로 변환 (embedding 제외)
+            doc = to_document({**record, "embedding": None})
+            doc.pop("@search.action", None)
+            doc.pop("embedding", None)
+            self.documents.append(doc)
+
+        # 사전 필터용 메타데이터 열 (portfolio / client / start_date / contract_amount)
+        self.filter_columns = FilterColumns(self.documents)
+
+        # 하이브리드 검색용 BM25 역색인 (text_fields 지정 시에만 생성)
+        self.bm25 = None
+        if text_fields:
+            self.bm25 = BM25Index(" ".join(str(doc.get(field) or "") for field in text_fields)
+                                  for doc in self.documents)
+
+        self.nprobe = nprobe
+        self.ann = None
+        if use_ann and os.path.exists(ann_path(prefix)):
+            ann = IVFIndex.load(ann_path(prefix))
+            if ann.fingerprint == store_fingerprint((doc["id"] for doc in self.documents), store.vectors):
+                self.ann = ann
+            else:
+                print(f"[WARN] {ann_path(prefix)} 가 벡터 저장소와 맞지 않아 정확 탐색을 사용합니다. (build_ann_index.py 재실행 필요)")
+
+    def top_rows(self, query_embedding, top_k, nprobe=None, mask=None):
+        """상위 k개 행 번호와 코사인 유사도 (유사도 내림차순)
+
+        mask 가 주어지면 조건에 맞는 행만 정확 탐색한다 (사전 필터, 후보가 줄어드므로 IVF 없이도 빠름).
+        """
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        if mask is not None:
+            candidates = np.flatnonzero(mask)
+            similarities = self.matrix[candidates] @ query
+        elif self.ann is not None:
+            return self.ann.search(self.matrix, query, top_k, nprobe=nprobe or self.nprobe)
+        else:
+            candidates = None
+            similarities = self.matrix @ query
+
+        k = min(top_k, len(similarities))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+        rows = candidates[top] if candidates is not None else top
+        return rows, similarities[top]
+
+    def search(self, query_embedding, top_k, query_text=None, filters=None, include_vectors=False):
+        mask = self.filter_columns.mask(filters) if filters else None
+        if query_text and self.bm25 is not None:
+            return self.hybrid_search(query_embedding, query_text, top_k, mask=mask, include_vectors=include_vectors)
+
+        rows, similarities = self.top_rows(query_embedding, top_k, mask=mask)
+        # Azure AI Search 코사인 점수와 동일한 스케일: 1 / (1 + 코사인 거리)
+        return [
+            self._result(i, float(1.0 / (2.0 - sim)), include_vectors)
+            for i, sim in zip(rows, similarities)
+        ]
+
+    def hybrid_search(self, query_embedding, query_text, top_k, mask=None, include_vectors=False):
+        """벡터 top-N 과 BM25 top-N 을 RRF 로 결합 (@search.score 는 Azure 하이브리드처럼 RRF 점수)"""
+        n_candidates = max(top_k * HYBRID_CANDIDATE_FACTOR, HYBRID_MIN_CANDIDATES)
+        vector_rows, _ = self.top_rows(query_embedding, n_candidates, mask=mask)
+        keyword_rows, _ = self.bm25.search(query_text, n_candidates, mask=mask)
+        fused = reciprocal_rank_fusion([vector_rows.tolist(), keyword_rows.tolist()])[:top_k]
+        return [{**self._result(row, float(score), include_vectors), SCORE_TYPE_FIELD: RRF_SCORE} for row, score in fused]
+
+    def _result(self, row, score, include_vectors):
+        result = {**self.documents[row], "@search.score": score}
+        if include_vectors:
+            # 정규화된 행 벡터 (MMR 등 후처리용, 복사 없이 행렬 뷰)
+            result["embedding"] = self.matrix[row]
+        return result
+
+
+class LocalSearchBackend:
+    """enriched 벡터 저장소를 메모리에 올려 코사인 top-k 검색 (오프라인 실행 가능)"""
+
+    name = "local"
+
+    def __init__(self, data_dir=DEFAULT_LOCAL_DIR, use_ann=True, nprobe=DEFAULT_NPROBE, mode="vector"):
+        self.data_dir = data_dir
+        self.use_ann = use_ann
+        self.nprobe = nprobe
+        self.mode = mode
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def get_index(self, index_name):
+        with self._lock:
+            if index_name not in self._indexes:
+                prefix, to_document = LOCAL_INDEXES[index_name]
+                self._indexes[index_name] = LocalIndex(
+                    os.path.join(self.data_dir, prefix), to_document,
+                    use_ann=self.use_ann, nprobe=self.nprobe,
+                    text_fields=TEXT_FIELDS[index_name] if self.mode == "hybrid" else None
+                )
+            return self._indexes[index_name]
+
+    def search(self, index_name, query_embedding, top_k, timeout=None, query_text=None, filters=None,
+               include_vectors=False):
+        # 메모리 내 검색이므로 timeout 은 사용하지 않음 (인터페이스 호환용)
+        return self.get_index(index_name).search(query_embedding, top_k, query_text=query_text, filters=filters,
+                                                 include_vectors=include_vectors)
+
+    def facets(self, index_name, fields, count=50, timeout=None):
+        columns = self.get_index(index_name).filter_columns
+        return {field: columns.facets(field, count) for field in fields}
+
+
+def create_search_backend(search_client=None):
+    """SEARCH_BACKEND(azure / local), SEARCH_MODE(vector / hybrid) 환경 변수로 검색 백엔드 선택"""
+    backend = os.getenv("SEARCH_BACKEND", "azure").lower()
+    mode = os.getenv("SEARCH_MODE", "vector").lower()
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"알 수 없는 SEARCH_MODE: {mode}")
+    if backend == "local":
+        return LocalSearchBackend(
+            os.getenv("LOCAL_INDEX_DIR", DEFAULT_LOCAL_DIR),
+            use_ann=os.getenv("LOCAL_ANN", "true").lower() == "true",
+            nprobe=int(os.getenv("ANN_NPROBE", str(DEFAULT_NPROBE))),
+            mode=mode
+        )
+    if backend == "azure":
+        return AzureSearchBackend(search_client or create_search_client(), mode=mode)
+    raise ValueError(f"알 수 없는 SEARCH_BACKEND: {backend}")
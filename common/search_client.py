@@ -0,0 +1,75 @@
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_VERSION = "2023-10-01-Preview"
+
+
+class SearchClient:
+    """Azure AI Search REST 클라이언트 (keep-alive 커넥션 풀 + 429/503 재시도)
+
+    프로세스당 하나를 만들어 공유하면 요청마다 TCP/TLS 연결을 새로 맺지 않는다.
+    """
+
+    def __init__(self, endpoint, api_key, api_version=API_VERSION, pool_size=10,
+                 connect_timeout=3.05, read_timeout=30, max_retries=3, backoff_factor=0.5):
+        self.endpoint = (endpoint or "").rstrip("/")
+        self.api_version = api_version
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=max_retries,
+            status_forcelist=(429, 503),
+            allowed_methods=frozenset(["GET", "POST"]),  # 검색/인덱싱 요청은 모두 POST
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_factor,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "api-key": api_key or ""
+        })
+
+    def _timeout(self, timeout):
+        return (self.connect_timeout, timeout if timeout is not None else self.read_timeout)
+
+    def _url(self, index_name, operation):
+        return f"{self.endpoint}/indexes/{index_name}/docs/{operation}?api-version={self.api_version}"
+
+    def search(self, index_name, body, timeout=None):
+        """docs/search 호출 → 응답 JSON"""
+        response = self.session.post(self._url(index_name, "search"), json=body, timeout=self._timeout(timeout))
+        response.raise_for_status()
+        return response.json()
+
+    def index_documents(self, index_name, documents, timeout=None):
+        """docs/index 호출 → requests.Response (207 부분 성공 처리는 호출 측에서)"""
+        return self.session.post(self._url(index_name, "index"), json={"value": documents},
+                                 timeout=self._timeout(timeout))
+
+    def close(self):
+        self.session.close()
+
+
+def create_search_client():
+    """환경 변수 설정으로 SearchClient 생성"""
+    return SearchClient(
+        os.getenv("SEARCH_ENDPOINT"),
+        os.getenv("SEARCH_ADMIN_KEY"),
+        pool_size=int(os.getenv("SEARCH_POOL_SIZE", "10")),
+        connect_timeout=float(os.getenv("SEARCH_CONNECT_TIMEOUT", "3.05")),
+        read_timeout=float(os.getenv("SEARCH_READ_TIMEOUT", "30")),
+        max_retries=int(os.getenv("SEARCH_MAX_RETRIES", "3"))
+    )
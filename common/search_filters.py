@@ -0,0 +1,102 @@
+from collections import Counter
+from datetime import date
+
+import numpy as np
+
+# ✅ 프로젝트 검색 사전 필터 (벡터 점수 계산 전에 후보를 좁힘)
+#    {"portfolio": "ITO" 또는 ["ITO", "SI"], "client": "주식회사 케이티" 또는 [...],
+#     "date_from": "2022-01-01", "date_to": "2024-12-31", "min_amount": 100000000, "max_amount": None}
+FILTER_KEYS = ("portfolio", "client", "date_from", "date_to", "min_amount", "max_amount")
+
+# 패싯(값별 건수)을 제공하는 필드
+FACET_FIELDS = ("portfolio", "client")
+
+
+def build_filters(portfolio=None, client=None, recent_years=None, date_from=None, date_to=None,
+                  min_amount=None, max_amount=None, today=None):
+    """필터 dict 생성 (값이 없는 조건은 제외, recent_years=3 → 최근 3년 착수 프로젝트)"""
+    if recent_years and not date_from:
+        today = today or date.today()
+        try:
+            date_from = today.replace(year=today.year - recent_years).isoformat()
+        except ValueError:  # 2월 29일
+            date_from = today.replace(year=today.year - recent_years, day=28).isoformat()
+    filters = {
+        "portfolio": portfolio,
+        "client": client,
+        "date_from": date_from,
+        "date_to": date_to,
+        "min_amount": min_amount,
+        "max_amount": max_amount
+    }
+    return {key: value for key, value in filters.items() if value not in (None, "", [])}
+
+
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def _odata_string(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _odata_in(field, values):
+    if len(values) == 1:
+        return f"{field} eq {_odata_string(values[0])}"
+    # search.in 은 구분자를 지정할 수 있으므로 값에 쉼표가 있어도 안전한 "|" 사용
+    return f"search.in({field}, {_odata_string('|'.join(values))}, '|')"
+
+
+def to_odata(filters):
+    """Azure AI Search $filter (OData) 식"""
+    clauses = []
+    if filters.get("portfolio"):
+        clauses.append(_odata_in("portfolio", _as_list(filters["portfolio"])))
+    if filters.get("client"):
+        clauses.append(_odata_in("client", _as_list(filters["client"])))
+    if filters.get("date_from"):
+        clauses.append(f"start_date ge {filters['date_from']}T00:00:00Z")
+    if filters.get("date_to"):
+        clauses.append(f"start_date le {filters['date_to']}T23:59:59Z")
+    if filters.get("min_amount") is not None:
+        clauses.append(f"contract_amount ge {int(filters['min_amount'])}")
+    if filters.get("max_amount") is not None:
+        clauses.append(f"contract_amount le {int(filters['max_amount'])}")
+    return " and ".join(clauses)
+
+
+class FilterColumns:
+    """로컬 백엔드용 필터 열 배열 (문서 목록에서 한 번 만들어 두고 조건마다 마스크 계산)"""
+
+    def __init__(self, documents):
+        self.portfolio = np.array([doc.get("portfolio") or "" for doc in documents], dtype=object)
+        self.client = np.array([doc.get("client") or "" for doc in documents], dtype=object)
+        self.start_date = np.array(
+            [(doc.get("start_date") or "")[:10] or "NaT" for doc in documents], dtype="datetime64[D]"
+        )
+        amounts = [doc.get("contract_amount") for doc in documents]
+        self.has_amount = np.array([amount is not None for amount in amounts])
+        self.contract_amount = np.array([amount or 0 for amount in amounts], dtype=np.int64)
+
+    def mask(self, filters):
+        """조건을 모두 만족하는 행 = True"""
+        mask = np.ones(len(self.portfolio), dtype=bool)
+        if filters.get("portfolio"):
+            mask &= np.isin(self.portfolio, _as_list(filters["portfolio"]))
+        if filters.get("client"):
+            mask &= np.isin(self.client, _as_list(filters["client"]))
+        # 날짜/금액이 없는 행은 범위 조건에서 제외 (Azure 의 null 비교 결과와 동일)
+        if filters.get("date_from"):
+            mask &= self.start_date >= np.datetime64(filters["date_from"])
+        if filters.get("date_to"):
+            mask &= self.start_date <= np.datetime64(filters["date_to"])
+        if filters.get("min_amount") is not None:
+            mask &= self.has_amount & (self.contract_amount >= int(filters["min_amount"]))
+        if filters.get("max_amount") is not None:
+            mask &= self.has_amount & (self.contract_amount <= int(filters["max_amount"]))
+        return mask
+
+    def facets(self, field, count=50):
+        """필드 값별 문서 수 (많은 순)"""
+        values = Counter(value for value in getattr(self, field) if value)
+        return values.most_common(count)
@@ -0,0 +1,106 @@
+import threading
+from collections import deque
+
+import numpy as np
+
+# ✅ 의미 기반 질의 캐시: 이전 질의 임베딩과 코사인 유사도가 임계값 이상이면 저장된 결과 재사용
+#    (재공고된 과업지시서처럼 내용이 조금만 다른 질의는 해시 캐시로는 적중하지 않음)
+DEFAULT_THRESHOLD = 0.98
+DEFAULT_MAX_ENTRIES = 512
+# 유사도 분포 지표에 사용할 최근 조회 수
+DEFAULT_HISTORY = 1000
+# 유사도 분포 구간 (0.80 미만은 첫 구간에 포함)
+HISTOGRAM_EDGES = np.round(np.arange(0.80, 1.0001, 0.02), 2)
+
+
+class SemanticCache:
+    """질의 임베딩 행렬(NumPy) + 결과 목록, 용량을 넘으면 가장 오래 쓰지 않은 항목부터 교체
+
+    key 는 결과에 영향을 주는 설정(모델, 검색 모드, 필터 등)으로, 같은 key 끼리만 비교한다.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, max_entries=DEFAULT_MAX_ENTRIES, history=DEFAULT_HISTORY):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._matrix = None
+        self._keys = np.empty(max_entries, dtype=object)
+        self._values = [None] * max_entries
+        self._last_used = np.zeros(max_entries, dtype=np.int64)
+        self._size = 0
+        self._clock = 0
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self._similarities = deque(maxlen=history)
+
+    @staticmethod
+    def _normalize(embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def get(self, embedding, key=""):
+        """→ (저장된 결과, 유사도), 임계값 미만이면 (None, 가장 가까운 유사도), 비교할 항목이 없으면 (None, None)"""
+        query = self._normalize(embedding)
+        with self._lock:
+            self.lookups += 1
+            if self._size == 0 or self._matrix.shape[1] != len(query):
+                return None, None
+            same_key = self._keys[:self._size] == key
+            if not same_key.any():
+                return None, None
+            similarities = np.where(same_key, self._matrix[:self._size] @ query, -np.inf)
+            row = int(np.argmax(similarities))
+            similarity = float(similarities[row])
+            self._similarities.append(similarity)
+            if similarity < self.threshold:
+                return None, similarity
+            self.hits += 1
+            self._clock += 1
+            self._last_used[row] = self._clock
+            return self._values[row], similarity
+
+    def put(self, embedding, value, key=""):
+        query = self._normalize(embedding)
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != len(query):
+                # 첫 저장(또는 임베딩 차원 변경) 시 용량만큼 행렬 할당
+                self._matrix = np.zeros((self.max_entries, len(query)), dtype=np.float32)
+                self._size = 0
+            if self._size < self.max_entries:
+                row = self._size
+                self._size += 1
+            else:
+                row = int(np.argmin(self._last_used))
+            self._matrix[row] = query
+            self._keys[row] = key
+            self._values[row] = value
+            self._clock += 1
+            self._last_used[row] = self._clock
+
+    def stats(self):
+        """적중률 + 최근 조회의 최고 유사도 분포 (임계값 조정용)"""
+        with self._lock:
+            similarities = np.array(self._similarities, dtype=np.float32)
+            stats = {
+                "entries": self._size,
+                "capacity": self.max_entries,
+                "threshold": self.threshold,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "similarity": None,
+                "histogram": []
+            }
+        if len(similarities):
+            stats["similarity"] = {
+                "p50": float(np.percentile(similarities, 50)),
+                "p90": float(np.percentile(similarities, 90)),
+                "p99": float(np.percentile(similarities, 99)),
+                "max": float(similarities.max())
+            }
+            counts, _ = np.histogram(np.clip(similarities, HISTOGRAM_EDGES[0], HISTOGRAM_EDGES[-1]), HISTOGRAM_EDGES)
+            stats["histogram"] = [
+                (float(low), float(high), int(count))
+                for low, high, count in zip(HISTOGRAM_EDGES[:-1], HISTOGRAM_EDGES[1:], counts)
+            ]
+        return stats
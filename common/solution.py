@@ -0,0 +1,106 @@
+from common.analysis import split_document
+from common.rank_fusion import SCORE_TYPE_FIELD
+
+
+def to_index_document(record):
+    """solution-embedding-index 업로드 문서 생성"""
+    return {
+        "@search.action": "upload",
+        "id": record["id"],
+        "name": record["name"],
+        "description": record.get("longDescription", ""),
+        "embedding": record["embedding"]
+    }
+
+
+# ✅ 솔루션 passage 인덱스 (브로셔 PDF 를 페이지 단위 passage 로 나눠 passage 마다 벡터 1개)
+DEFAULT_PASSAGE_CHARS = 800
+# 페이지 번호만 남은 조각 등 너무 짧은 passage 는 제외
+DEFAULT_MIN_PASSAGE_CHARS = 40
+# 솔루션 단위로 합치기 전에 가져올 passage 후보 수 (top_k 의 배수, 최소값)
+PASSAGE_CANDIDATE_FACTOR = 10
+PASSAGE_MIN_CANDIDATES = 50
+PASSAGE_AGGREGATIONS = ("max", "sum")
+
+
+def build_profile_text(solution):
+    """솔루션 소개 정보 passage (PDF 가 없는 솔루션도 검색되도록 모든 솔루션에 1개씩 생성)"""
+    lines = [f"솔루션명: {solution['name']}", solution.get("longDescription") or solution.get("description") or ""]
+    if solution.get("benefits"):
+        lines.append("주요 강점: " + ", ".join(solution["benefits"]))
+    if solution.get("techSpecs"):
+        lines.append("기술 사양: " + ", ".join(solution["techSpecs"]))
+    for case in solution.get("caseStudies") or []:
+        lines.append(f"적용 사례: {case.get('title', '')} ({case.get('company', '')}) - {case.get('result', '')}")
+    return "\n".join(line for line in lines if line)
+
+
+def iter_passages(solution, pages, max_chars=DEFAULT_PASSAGE_CHARS, min_chars=DEFAULT_MIN_PASSAGE_CHARS):
+    """솔루션 1건 + PDF 페이지 목록 → passage 레코드 (page 0 = 솔루션 소개 정보)"""
+    texts = [(0, build_profile_text(solution))]
+    for page in pages:
+        text = page["text"].strip()
+        for chunk in split_document(text, max_chars, max_chunks=max(1, len(text))):
+            texts.append((page["page"], chunk.strip()))
+
+    number = 0
+    for page_no, text in texts:
+        if page_no and len(text) < min_chars:
+            continue
+        number += 1
+        yield {
+            "id": f"{solution['id']}-{number:03d}",
+            "parent_id": solution["id"],
+            "name": solution["name"],
+            "description": solution.get("longDescription", ""),
+            "page": page_no,
+            "text": text
+        }
+
+
+def to_passage_document(record):
+    """solution-passage-index 업로드 문서 생성"""
+    return {
+        "@search.action": "upload",
+        "id": record["id"],
+        "parent_id": record["parent_id"],
+        "name": record["name"],
+        "description": record.get("description", ""),
+        "page": record["page"],
+        "text": record["text"],
+        "embedding": record["embedding"]
+    }
+
+
+def aggregate_passages(hits, top_k, method="max", top_n=3, max_passages=3):
+    """passage 검색 결과 → 솔루션 단위 결과 (솔루션 인덱스 검색 결과와 같은 형태 + passages)
+
+    method="max" 는 가장 잘 맞는 passage 점수, "sum" 은 상위 top_n passage 점수 합을 top_n 으로 나눈 값
+    (순위는 합과 같고 점수 스케일은 passage 점수와 같게 유지). passages 는 점수 내림차순 상위 max_passages 개.
+    """
+    if method not in PASSAGE_AGGREGATIONS:
+        raise ValueError(f"알 수 없는 passage 집계 방식: {method}")
+    grouped = {}
+    for hit in sorted(hits, key=lambda h: h.get("@search.score", 0), reverse=True):
+        grouped.setdefault(hit["parent_id"], []).append(hit)
+
+    results = []
+    for parent_id, passages in grouped.items():
+        scores = [passage.get("@search.score", 0) for passage in passages]
+        score = scores[0] if method == "max" else sum(scores[:top_n]) / top_n
+        result = {
+            "id": parent_id,
+            "name": passages[0]["name"],
+            "description": passages[0].get("description", ""),
+            "@search.score": score,
+            "passages": [
+                {"page": passage["page"], "text": passage["text"], "score": passage.get("@search.score", 0)}
+                for passage in passages[:max_passages]
+            ]
+        }
+        # 점수 종류(하이브리드 RRF 등)는 passage 점수를 그대로 따름
+        if SCORE_TYPE_FIELD in passages[0]:
+            result[SCORE_TYPE_FIELD] = passages[0][SCORE_TYPE_FIELD]
+        results.append(result)
+    results.sort(key=lambda doc: doc["@search.score"], reverse=True)
+    return results[:top_k]
@@ -0,0 +1,120 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+from common.jsonl import JsonlWriter, read_jsonl
+
+# ✅ 벡터 저장소 구성: {prefix}.npy (N x dim 연속 배열) + {prefix}.jsonl (행 순서가 같은 메타데이터)
+SUPPORTED_DTYPES = ("float32", "float16")
+
+# 스트리밍 저장 시 행 수를 미리 알 수 없으므로 충분히 큰 shape 기준으로 헤더 공간을 예약
+_RESERVED_ROWS = 2 ** 40
+
+
+def _npy_header(rows, dim, dtype, length=None):
+    """.npy v1.0 헤더 생성 (length 지정 시 같은 길이로 패딩)"""
+    header = "{'descr': %r, 'fortran_order': False, 'shape': (%d, %d), }" % (np.dtype(dtype).str, rows, dim)
+    if length is None:
+        length = (10 + len(header) + 1 + 63) // 64 * 64
+    header = header.ljust(length - 10 - 1) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1")
+
+
+class VectorStoreWriter:
+    """embedding 을 .npy 로, 나머지 필드를 행 정렬된 JSONL 로 스트리밍 저장"""
+
+    def __init__(self, prefix, dtype="float32"):
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"지원하지 않는 dtype: {dtype}")
+        self.prefix = prefix
+        self.dtype = np.dtype(dtype)
+        self.dim = None
+        self.count = 0
+        self._npy_path = f"{prefix}.npy"
+        self._tmp_npy_path = f"{self._npy_path}.tmp"
+        self._header_length = None
+        self._vectors = None
+        self._metadata = JsonlWriter(f"{prefix}.jsonl")
+
+    def write(self, record):
+        record = dict(record)
+        vector = np.asarray(record.pop("embedding"), dtype=self.dtype)
+        if self.dim is None:
+            self.dim = len(vector)
+            reserved = _npy_header(_RESERVED_ROWS, self.dim, self.dtype)
+            self._header_length = len(reserved)
+            self._vectors = open(self._tmp_npy_path, "wb")
+            self._vectors.write(reserved)
+        elif len(vector) != self.dim:
+            raise ValueError(f"embedding 차원 불일치: {len(vector)} != {self.dim} (id={record.get('id')})")
+
+        self._vectors.write(vector.tobytes())
+        self._metadata.write(record)
+        self.count += 1
+
+    def close(self):
+        if self._vectors is None:
+            # 빈 저장소
+            self._vectors = open(self._tmp_npy_path, "wb")
+            self.dim = 0
+            self._vectors.write(_npy_header(0, 0, self.dtype))
+        else:
+            self._vectors.seek(0)
+            self._vectors.write(_npy_header(self.count, self.dim, self.dtype, self._header_length))
+        self._vectors.close()
+        os.replace(self._tmp_npy_path, self._npy_path)
+        self._metadata.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            if self._vectors is not None:
+                self._vectors.close()
+                os.remove(self._tmp_npy_path)
+            self._metadata.__exit__(exc_type, exc, tb)
+
+
+class VectorStore:
+    """np.memmap 기반 읽기 전용 벡터 저장소 (벡터를 복사하지 않고 바로 사용)"""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.vectors = np.load(f"{prefix}.npy", mmap_mode="r")
+        self.metadata_path = f"{prefix}.jsonl"
+
+    def __len__(self):
+        return self.vectors.shape[0]
+
+    @property
+    def dim(self):
+        return self.vectors.shape[1]
+
+    def iter_metadata(self):
+        return read_jsonl(self.metadata_path)
+
+    def load_metadata(self):
+        return list(self.iter_metadata())
+
+    def iter_records(self):
+        """메타데이터 + embedding(list) 를 한 행씩 반환 (업로드용)"""
+        for row, record in enumerate(self.iter_metadata()):
+            record["embedding"] = self.vectors[row].astype(np.float32).tolist()
+            yield record
+
+
+def convert_json(json_path, prefix, dtype="float32", transform=None):
+    """기존 enriched *.json (embedding 포함 JSON 배열) → 벡터 저장소 변환"""
+    with open(json_path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    if transform is not None:
+        records = transform(records)
+    with VectorStoreWriter(prefix, dtype=dtype) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.count
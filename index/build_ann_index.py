@@ -0,0 +1,35 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.ann_index import IVFIndex, ann_path, default_n_lists, store_fingerprint
+from common.vector_store import VectorStore
+
+# 로컬 검색 백엔드용 IVF 인덱스를 벡터 저장소 옆({prefix}.ivf.npz)에 생성
+
+parser = argparse.ArgumentParser(description="벡터 저장소 → IVF 근사 검색 인덱스 생성")
+parser.add_argument("--prefix", default="data/preprocess_results/enriched_project_history",
+                    help="벡터 저장소 경로 prefix (.npy / .jsonl)")
+parser.add_argument("--n-lists", type=int, help="클러스터 수 (기본: 4 * sqrt(N))")
+parser.add_argument("--n-iter", type=int, default=20, help="k-means 반복 횟수")
+parser.add_argument("--seed", type=int, default=0)
+args = parser.parse_args()
+
+store = VectorStore(args.prefix)
+vectors = np.asarray(store.vectors, dtype=np.float32)
+matrix = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+n_lists = args.n_lists or default_n_lists(len(matrix))
+
+print(f"[INFO] {len(matrix)}건 / {n_lists}개 리스트로 IVF 인덱스 생성 중...")
+start = time.perf_counter()
+fingerprint = store_fingerprint((record["id"] for record in store.iter_metadata()), store.vectors)
+index = IVFIndex.build(matrix, n_lists=n_lists, n_iter=args.n_iter, seed=args.seed, fingerprint=fingerprint)
+index.save(ann_path(args.prefix))
+
+sizes = np.diff(index.list_offsets)
+print(f"✅ IVF 인덱스 저장 완료 → {ann_path(args.prefix)} ({time.perf_counter() - start:.1f}초)")
+print(f"📊 리스트 크기: 평균 {sizes.mean():.1f} / 최대 {sizes.max()} / 빈 리스트 {int((sizes == 0).sum())}개")
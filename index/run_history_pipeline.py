@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import argparse
+from dotenv import load_dotenv
+from openai import AzureOpenAI
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.embedding import iter_embedded
+from common.embedding_cache import open_default_cache
+from common.history import iter_csv_records, load_manifest, save_manifest, sync_history_index
+from common.index_upload import IndexBatchWriter
+from common.search_client import create_search_client
+
+# CSV → 레코드 → embedding → 인덱스 업로드를 한 번에 스트리밍 처리
+# (중간 파일 없이 배치 단위로 흘려보내므로 CSV 크기와 무관하게 메모리 사용량이 일정)
+
+load_dotenv()
+
+client = AzureOpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    api_version=os.getenv("OPENAI_API_VERSION"),
+    azure_endpoint=os.getenv("OPENAI_ENDPOINT")
+)
+
+embedding_model = os.getenv("OPENAI_EMBEDDING_DEPLOYMENT")
+batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+max_workers = int(os.getenv("EMBEDDING_MAX_WORKERS", "4"))
+
+index_name = "project-history-index"
+
+parser = argparse.ArgumentParser(description="프로젝트 이력 CSV → Azure AI Search 스트리밍 파이프라인")
+parser.add_argument("--csv", default="data/history_csv/project_history.csv", help="입력 CSV 경로 (cp949)")
+parser.add_argument("--full", action="store_true", help="매니페스트를 무시하고 전체 재처리")
+args = parser.parse_args()
+
+cache = open_default_cache()
+manifest = {} if args.full else load_manifest()
+
+
+def embed_stream(records):
+    return iter_embedded(
+        client,
+        embedding_model,
+        records,
+        "summary_text",
+        batch_size=batch_size,
+        max_workers=max_workers,
+        cache=cache
+    )
+
+
+start = time.perf_counter()
+with IndexBatchWriter(create_search_client(), index_name) as writer:
+    new_manifest, counts = sync_history_index(
+        iter_csv_records(args.csv),
+        writer,
+        manifest,
+        embed_stream=embed_stream
+    )
+elapsed = time.perf_counter() - start
+
+save_manifest(new_manifest)
+
+processed = counts["added"] + counts["changed"]
+print(f"[INFO] 신규 {counts['added']}건 / 변경 {counts['changed']}건 / 삭제 {counts['deleted']}건 / 유지 {counts['unchanged']}건")
+print(f"⏱️ {processed}건 / {elapsed:.1f}초 ({processed / max(elapsed, 1e-9):.1f} records/sec)")
+
+writer.print_summary()
+if writer.failed_keys:
+    print(f"⚠️ {len(writer.failed_keys)}건 업로드 실패 → 다시 실행하면 실패분만 재전송됩니다.")
+else:
+    print("✅ 프로젝트 이력 파이프라인 완료!")
@@ -1,46 +1,40 @@
 import os
-import json
-import requests
+import sys
+import argparse
 from dotenv import load_dotenv
-from math import ceil
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.history import load_manifest, save_manifest, sync_history_index
+from common.index_upload import IndexBatchWriter
+from common.search_client import create_search_client
+from common.vector_store import VectorStore
 
 # env 불러오기
 load_dotenv()
 
-AZURE_SEARCH_ENDPOINT = os.getenv("SEARCH_ENDPOINT")
-AZURE_SEARCH_KEY = os.getenv("SEARCH_ADMIN_KEY")
-API_VERSION = "2023-10-01-Preview"
-
-headers = {
-    "Content-Type": "application/json",
-    "api-key": AZURE_SEARCH_KEY
-}
-
 index_name = "project-history-index"
 
-with open("data/preprocess_results/enriched_project_history.json", "r", encoding="utf-8") as f:
-    documents = json.load(f)
+parser = argparse.ArgumentParser(description="프로젝트 이력 인덱스 업로드 (기본: 변경분만 반영)")
+parser.add_argument("--full", action="store_true", help="매니페스트를 무시하고 전체 재업로드")
+args = parser.parse_args()
 
-upload_docs = []
-for doc in documents:
-    upload_docs.append({
-        "@search.action": "upload",
-        "id": doc["id"],
-        "department": doc["department"],
-        "project_name": doc["project_name"],
-        "summary_text": doc["summary_text"],
-        "embedding": doc["embedding"]
-    })
+# 이전 업로드 매니페스트와 비교해 변경분만 전송
+manifest = {} if args.full else load_manifest()
 
-batch_size = 500
-total_batches = ceil(len(upload_docs) / batch_size)
+with IndexBatchWriter(create_search_client(), index_name) as writer:
+    new_manifest, counts = sync_history_index(
+        VectorStore("data/preprocess_results/enriched_project_history").iter_records(),
+        writer,
+        manifest
+    )
 
-for i in range(total_batches):
-    batch = upload_docs[i * batch_size:(i + 1) * batch_size]
-    url = f"{AZURE_SEARCH_ENDPOINT}/indexes/{index_name}/docs/index?api-version={API_VERSION}"
-    response = requests.post(url, headers=headers, json={"value": batch})
+print(f"[INFO] 신규 {counts['added']}건 / 변경 {counts['changed']}건 / 삭제 {counts['deleted']}건 / 유지 {counts['unchanged']}건")
 
-    print(f"Batch {i+1}/{total_batches} → Status: {response.status_code}")
-    print(response.json())
+# 성공한 문서만 매니페스트에 반영 (실패분은 다음 실행에서 다시 전송)
+save_manifest(new_manifest)
 
-print("✅ 모든 프로젝트 이력 데이터 업로드 완료!")
+writer.print_summary()
+if writer.failed_keys:
+    print(f"⚠️ {len(writer.failed_keys)}건 업로드 실패 → 다시 실행하면 실패분만 재전송됩니다.")
+else:
+    print("✅ 모든 프로젝트 이력 데이터 업로드 완료!")
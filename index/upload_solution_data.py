@@ -1,48 +1,31 @@
 import os
-import json
-import requests
+import sys
 from dotenv import load_dotenv
-from math import ceil
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.index_upload import IndexBatchWriter
+from common.search_client import create_search_client
+from common.solution import to_index_document
+from common.vector_store import VectorStore
 
 # env 불러오기
 load_dotenv()
 
-AZURE_SEARCH_ENDPOINT = os.getenv("SEARCH_ENDPOINT")
-AZURE_SEARCH_KEY = os.getenv("SEARCH_ADMIN_KEY")
-API_VERSION = "2023-10-01-Preview"
-
-headers = {
-    "Content-Type": "application/json",
-    "api-key": AZURE_SEARCH_KEY
-}
+# 커넥션 풀 + 429/503 재시도가 적용된 공용 검색 클라이언트
+search_client = create_search_client()
 
 index_name = "solution-embedding-index"
 
-# JSON 파일 로드
-with open("data/preprocess_results/enriched_solution.json", "r", encoding="utf-8") as f:
-    documents = json.load(f)
-
-# documents 변환
-upload_docs = []
-for doc in documents:
-    upload_docs.append({
-        "@search.action": "upload",
-        "id": doc["id"],
-        "name": doc["name"],
-        "description": doc.get("longDescription", ""),
-        "embedding": doc["embedding"]
-    })
-
-# 배치 분할 (최대 1000건씩)
-batch_size = 500
-total_batches = ceil(len(upload_docs) / batch_size)
-
-for i in range(total_batches):
-    batch = upload_docs[i * batch_size:(i + 1) * batch_size]
-    url = f"{AZURE_SEARCH_ENDPOINT}/indexes/{index_name}/docs/index?api-version={API_VERSION}"
-    response = requests.post(url, headers=headers, json={"value": batch})
+# 벡터 저장소 로드 (.npy memmap + 메타데이터 .jsonl)
+store = VectorStore("data/preprocess_results/enriched_solution")
 
-    print(f"Batch {i+1}/{total_batches} → Status: {response.status_code}")
-    print(response.json())
+# 크기 기준 배치 분할 + 병렬 전송 (실패한 문서만 재시도)
+with IndexBatchWriter(search_client, index_name) as writer:
+    for doc in store.iter_records():
+        writer.add(to_index_document(doc))
 
-print("✅ 모든 데이터 업로드 완료!")
+writer.print_summary()
+if writer.failed_keys:
+    print(f"⚠️ {len(writer.failed_keys)}건 업로드 실패")
+else:
+    print("✅ 모든 데이터 업로드 완료!")
@@ -0,0 +1,31 @@
+import os
+import sys
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.index_upload import IndexBatchWriter
+from common.search_client import create_search_client
+from common.solution import to_passage_document
+from common.vector_store import VectorStore
+
+# env 불러오기
+load_dotenv()
+
+# 커넥션 풀 + 429/503 재시도가 적용된 공용 검색 클라이언트
+search_client = create_search_client()
+
+index_name = "solution-passage-index"
+
+# 벡터 저장소 로드 (.npy memmap + 메타데이터 .jsonl)
+store = VectorStore("data/preprocess_results/solution_passages")
+
+# 크기 기준 배치 분할 + 병렬 전송 (실패한 문서만 재시도)
+with IndexBatchWriter(search_client, index_name) as writer:
+    for doc in store.iter_records():
+        writer.add(to_passage_document(doc))
+
+writer.print_summary()
+if writer.failed_keys:
+    print(f"⚠️ {len(writer.failed_keys)}건 업로드 실패")
+else:
+    print("✅ 모든 솔루션 passage 업로드 완료!")
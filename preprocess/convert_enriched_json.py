@@ -0,0 +1,27 @@
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.history import upgrade_legacy_records
+from common.vector_store import SUPPORTED_DTYPES, convert_json
+
+# 기존 enriched_*.json (pretty-print float 배열) → 벡터 저장소(.npy + .jsonl) 변환
+
+parser = argparse.ArgumentParser(description="enriched JSON → .npy/.jsonl 벡터 저장소 변환")
+parser.add_argument("json_path", help="예: data/preprocess_results/enriched_project_history.json")
+parser.add_argument("--output", help="출력 경로 prefix (기본: 입력 파일명에서 .json 제거)")
+parser.add_argument("--dtype", default="float32", choices=SUPPORTED_DTYPES)
+parser.add_argument("--history", action="store_true",
+                    help="프로젝트 이력 파일: 행 위치 기반 ID를 내용 기반 ID로 변환하고 content_hash 부여")
+args = parser.parse_args()
+
+output_prefix = args.output or os.path.splitext(args.json_path)[0]
+transform = upgrade_legacy_records if args.history else None
+
+count = convert_json(args.json_path, output_prefix, dtype=args.dtype, transform=transform)
+
+npy_size = os.path.getsize(f"{output_prefix}.npy")
+json_size = os.path.getsize(args.json_path)
+print(f"✅ {count}건 변환 완료 → {output_prefix}.npy / {output_prefix}.jsonl")
+print(f"📦 {json_size / 1024 / 1024:.1f}MB → 벡터 {npy_size / 1024 / 1024:.1f}MB")
@@ -1,9 +1,16 @@
 import os
-import json
+import sys
+import time
 from dotenv import load_dotenv
 from openai import AzureOpenAI
 from tqdm import tqdm
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.embedding import iter_embedded
+from common.embedding_cache import open_default_cache
+from common.jsonl import read_jsonl
+from common.vector_store import VectorStoreWriter
+
 load_dotenv()
 
 client = AzureOpenAI(
@@ -14,25 +21,38 @@ client = AzureOpenAI(
 
 embedding_model = os.getenv("OPENAI_EMBEDDING_DEPLOYMENT")
 
-# 파일 경로
-json_path = "data/preprocess_results/project_history.json"
-output_path = "data/preprocess_results/enriched_project_history.json"
-
-# 데이터 로드
-with open(json_path, "r", encoding="utf-8") as f:
-    data = json.load(f)
-
-# embedding 생성
-for item in tqdm(data):
-    text = item["summary_text"]
-    response = client.embeddings.create(
-        model=embedding_model,
-        input=text
-    )
-    item["embedding"] = response.data[0].embedding
-
-# 저장
-with open(output_path, "w", encoding="utf-8") as f:
-    json.dump(data, f, ensure_ascii=False, indent=2)
-
-print(f"✅ embedding 생성 완료 → {output_path}")
+# 배치 크기 / 동시 요청 수
+batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+max_workers = int(os.getenv("EMBEDDING_MAX_WORKERS", "4"))
+
+# 임베딩 캐시 (내용이 바뀌지 않은 레코드는 재요청하지 않음)
+cache = open_default_cache()
+
+# 벡터 저장 정밀도 (float32 / float16)
+store_dtype = os.getenv("EMBEDDING_STORE_DTYPE", "float32")
+
+# 파일 경로 (입력 JSONL → 벡터 저장소 .npy + 메타데이터 .jsonl)
+jsonl_path = "data/preprocess_results/project_history.jsonl"
+output_prefix = "data/preprocess_results/enriched_project_history"
+
+# embedding 생성 (배치 + 동시 요청, 입력 순서 유지)
+start = time.perf_counter()
+with tqdm() as progress, VectorStoreWriter(output_prefix, dtype=store_dtype) as writer:
+    for item in iter_embedded(
+        client,
+        embedding_model,
+        read_jsonl(jsonl_path),
+        "summary_text",
+        batch_size=batch_size,
+        max_workers=max_workers,
+        progress=progress,
+        cache=cache
+    ):
+        writer.write(item)
+elapsed = time.perf_counter() - start
+
+print(f"✅ embedding 생성 완료 → {output_prefix}.npy / {output_prefix}.jsonl")
+if cache is not None:
+    stats = cache.stats()
+    print(f"🗃️ 임베딩 캐시: hit {stats['hits']} / miss {stats['misses']} (항목 {stats['entries']}개, {stats['bytes'] / 1024 / 1024:.1f}MB)")
+print(f"⏱️ {writer.count}건 / {elapsed:.1f}초 ({writer.count / max(elapsed, 1e-9):.1f} records/sec)")
@@ -1,10 +1,20 @@
 import os
+import sys
 import json
-import fitz
-import re
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from openai import AzureOpenAI
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.embedding import embed_texts
+from common.embedding_cache import open_default_cache
+from common.jsonl import read_jsonl
+from common.pdf_text import extract_pdf_files, format_report
+from common.result_cache import ResultCache, content_key
+from common.vector_store import VectorStoreWriter
+
 load_dotenv()
 
 client = AzureOpenAI(
@@ -16,18 +26,27 @@ client = AzureOpenAI(
 embedding_model = os.getenv("OPENAI_EMBEDDING_DEPLOYMENT")
 chat_model = os.getenv("OPENAI_CHAT_DEPLOYMENT")
 
+# ✅ 임베딩 캐시
+cache = open_default_cache()
+
+# ✅ PDF 요약 캐시 (PDF 파일 해시 기준, 내용이 바뀌지 않은 브로셔는 다시 요약하지 않음)
+summary_cache_dir = os.getenv("PDF_SUMMARY_CACHE_DIR", "data/cache/pdf_summary")
+summary_cache = ResultCache(max_entries=4096, ttl_seconds=float("inf"), persist_dir=summary_cache_dir) \
+    if summary_cache_dir else None
+
+# 요약 프롬프트를 바꾸면 올려서 기존 요약 캐시를 무효화
+SUMMARY_PROMPT_VERSION = "1"
+
+# ✅ 동시 요약 요청 수 (rate limit 시 OpenAI 클라이언트가 Retry-After 를 따라 재시도)
+summary_max_workers = int(os.getenv("SUMMARY_MAX_WORKERS", "4"))
+summary_client = client.with_options(max_retries=6)
+
 # ✅ 파일 경로 설정
 json_path = "data/solution_json/solution.json"
 pdf_dir = "data/solution_pdf"
-output_path = "data/preprocess_results/enriched_solution.json"
-
-# ✅ PDF 텍스트 추출
-def extract_pdf_text(pdf_path):
-    doc = fitz.open(pdf_path)
-    text = ""
-    for page in doc:
-        text += page.get_text()
-    return text
+output_prefix = "data/preprocess_results/enriched_solution"  # .npy + .jsonl
+checkpoint_path = f"{output_prefix}.checkpoint.jsonl"  # 요약 완료분 (중단 후 재실행 시 이어서 진행)
+store_dtype = os.getenv("EMBEDDING_STORE_DTYPE", "float32")
 
 # ✅ GPT-4.1-mini 요약 (프롬프트 최적화)
 def summarize_pdf(pdf_text):
@@ -39,7 +58,7 @@ def summarize_pdf(pdf_text):
     - 차별화된 경쟁력은 적극 강조
     - 길이는 1000자 이내로 간결하게 작성
     """
-    response = client.chat.completions.create(
+    response = summary_client.chat.completions.create(
         model=chat_model,
         messages=[
             {"role": "system", "content": system_prompt},
@@ -50,48 +69,17 @@ def summarize_pdf(pdf_text):
     )
     return response.choices[0].message.content
 
-# ✅ Embedding 생성 (Azure Native)
-def get_embedding(text):
-    response = client.embeddings.create(
-        model=embedding_model,
-        input=text
-    )
-    return response.data[0].embedding
-
-# ✅ 기존 JSON 로드
-with open(json_path, 'r', encoding='utf-8') as f:
-    solutions = json.load(f)
-
-# ✅ 전체 데이터 통합 처리
-new_data = []
-
-for solution in solutions:
-    solution_name = solution['name']
-    pdf_filename = f"{solution_name}.pdf"
-    pdf_path = os.path.join(pdf_dir, pdf_filename)
-
-    # PDF 존재 여부 확인 → 요약 수행
-    if os.path.exists(pdf_path):
-        print(f"[INFO] PDF 요약 진행 중: {pdf_filename}")
-        pdf_text = extract_pdf_text(pdf_path)
-        pdf_summary = summarize_pdf(pdf_text)
-        solution['pdf_summary'] = pdf_summary
-        # solution['pdf_url'] = f"https://smjstorage.blob.core.windows.net/solution-pdf/{pdf_filename}"
-    else:
-        print(f"[INFO] PDF 없음 → 요약 생략: {pdf_filename}")
-        solution['pdf_summary'] = ""
-        # solution['pdf_url'] = ""
-
-    # embedding_text 생성 (RAG 최적화)
+# ✅ embedding_text 생성 (RAG 최적화)
+def build_embedding_text(solution):
     benefits = ", ".join(solution['benefits'] or [])
     techSpecs = ", ".join(solution['techSpecs'] or [])
     caseStudies = ", ".join([
-        case.get('title', '(제목없음)') 
+        case.get('title', '(제목없음)')
         for case in (solution['caseStudies'] or [])
     ])
 
-    embedding_text = f"""
-    솔루션명: {solution_name}.
+    return f"""
+    솔루션명: {solution['name']}.
     설명: {solution.get('longDescription', '')}.
     PDF 요약: {solution['pdf_summary']}.
     주요 강점: {benefits}.
@@ -100,13 +88,120 @@ for solution in solutions:
     이 솔루션의 경쟁사 대비 차별화된 독보적 강점은: {benefits}.
     """
 
-    solution['embedding_text'] = embedding_text
-    solution['embedding'] = get_embedding(embedding_text)
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+# ✅ 기존 JSON 로드
+with open(json_path, 'r', encoding='utf-8') as f:
+    solutions = json.load(f)
 
+start = time.perf_counter()
+
+# ✅ 솔루션별 작업 키 (솔루션 정보 + PDF 해시 + 모델/프롬프트 버전)
+pdf_paths = {}
+pdf_hashes = {}
+task_keys = []
+for solution in solutions:
+    pdf_path = os.path.join(pdf_dir, f"{solution['name']}.pdf")
+    if os.path.exists(pdf_path):
+        pdf_paths[solution['name']] = pdf_path
+        pdf_hashes[solution['name']] = file_sha256(pdf_path)
+    task_keys.append(content_key(
+        json.dumps(solution, ensure_ascii=False, sort_keys=True),
+        pdf_hashes.get(solution['name'], ""),
+        chat_model,
+        SUMMARY_PROMPT_VERSION
+    ))
+
+# ✅ 체크포인트 로드 (이전 실행에서 요약까지 끝난 솔루션은 건너뜀)
+summaries = {}
+if os.path.exists(checkpoint_path):
+    for entry in read_jsonl(checkpoint_path):
+        summaries[entry["key"]] = entry["pdf_summary"]
+    print(f"[INFO] 체크포인트에서 {sum(1 for key in task_keys if key in summaries)}건 이어서 진행")
+
+def summary_cache_key(name):
+    return content_key(pdf_hashes[name], chat_model, SUMMARY_PROMPT_VERSION)
+
+checkpoint = open(checkpoint_path, "a", encoding="utf-8")
+
+def save_checkpoint(key, pdf_summary):
+    summaries[key] = pdf_summary
+    checkpoint.write(json.dumps({"key": key, "pdf_summary": pdf_summary}, ensure_ascii=False) + "\n")
+    checkpoint.flush()
+
+# PDF 없는 솔루션 / 요약 캐시 적중 → 바로 완료, 나머지만 추출 + 요약 대상
+to_summarize = {}
+summary_hits = 0
+for solution, key in zip(solutions, task_keys):
+    name = solution['name']
+    if key in summaries:
+        continue
+    if name not in pdf_paths:
+        print(f"[INFO] PDF 없음 → 요약 생략: {name}.pdf")
+        save_checkpoint(key, "")
+        continue
+    cached_summary = summary_cache.get(summary_cache_key(name)) if summary_cache is not None else None
+    if cached_summary is not None:
+        summary_hits += 1
+        save_checkpoint(key, cached_summary)
+        continue
+    to_summarize[pdf_paths[name]] = (name, key)
+
+# ✅ PDF 추출(프로세스 풀) → 추출이 끝나는 대로 요약 요청(스레드 풀, 동시 요청 수 제한)
+failures = {}
+with ThreadPoolExecutor(max_workers=summary_max_workers) as executor:
+    futures = {}
+    for pdf_path, pdf_text, report in extract_pdf_files(to_summarize):
+        name, key = to_summarize[pdf_path]
+        print(f"[INFO] PDF 요약 진행 중: {name}.pdf ({format_report(report)})")
+        futures[executor.submit(summarize_pdf, pdf_text)] = (name, key)
+
+    for future in as_completed(futures):
+        name, key = futures[future]
+        try:
+            pdf_summary = future.result()
+        except Exception as e:
+            failures[name] = str(e)
+            print(f"[ERROR] PDF 요약 실패: {name}.pdf → {e}")
+            continue
+        if summary_cache is not None:
+            summary_cache.put(summary_cache_key(name), pdf_summary)
+        save_checkpoint(key, pdf_summary)
+
+checkpoint.close()
+
+if failures:
+    # 성공한 요약은 체크포인트에 남아 있으므로 다시 실행하면 실패분만 처리
+    print(f"[중단] PDF 요약 {len(failures)}건 실패 → 다시 실행하면 실패한 솔루션만 이어서 처리합니다.")
+    sys.exit(1)
+
+# ✅ embedding_text 생성 후 한 번에 배치 임베딩 (입력 순서 유지, 캐시 적중분은 요청 생략)
+new_data = []
+for solution, key in zip(solutions, task_keys):
+    solution['pdf_summary'] = summaries[key]
+    # solution['pdf_url'] = f"https://smjstorage.blob.core.windows.net/solution-pdf/{solution['name']}.pdf"
+    solution['embedding_text'] = build_embedding_text(solution)
     new_data.append(solution)
 
-# ✅ 결과 저장
-with open(output_path, 'w', encoding='utf-8') as f:
-    json.dump(new_data, f, ensure_ascii=False, indent=2)
+embeddings = embed_texts(client, embedding_model, [solution['embedding_text'] for solution in new_data], cache=cache)
+
+# ✅ 결과 저장 (embedding 은 .npy, 나머지 필드는 행 정렬된 .jsonl)
+with VectorStoreWriter(output_prefix, dtype=store_dtype) as writer:
+    for solution, embedding in zip(new_data, embeddings):
+        solution['embedding'] = embedding
+        writer.write(solution)
+
+# 저장까지 끝났으므로 체크포인트 삭제
+os.remove(checkpoint_path)
+elapsed = time.perf_counter() - start
 
-print(f"[완료] enriched_solution.json 저장 완료 → {output_path}")
+print(f"[완료] enriched_solution 저장 완료 → {output_prefix}.npy / {output_prefix}.jsonl")
+print(f"[INFO] PDF 요약 {len(to_summarize)}건 / 요약 캐시 적중 {summary_hits}건 / {elapsed:.1f}초")
+if cache is not None:
+    stats = cache.stats()
+    print(f"[INFO] 임베딩 캐시: hit {stats['hits']} / miss {stats['misses']}")
@@ -0,0 +1,73 @@
+import os
+import sys
+import json
+import time
+from dotenv import load_dotenv
+from openai import AzureOpenAI
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.embedding import embed_texts
+from common.embedding_cache import open_default_cache
+from common.pdf_text import extract_pdf_pages, page_report, format_report
+from common.solution import DEFAULT_PASSAGE_CHARS, iter_passages
+from common.vector_store import VectorStoreWriter
+
+# 솔루션 브로셔 PDF 전체 텍스트를 passage 단위로 나눠 임베딩 (솔루션당 요약 벡터 1개 대신 passage 마다 벡터 1개)
+
+load_dotenv()
+
+client = AzureOpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    api_version=os.getenv("OPENAI_API_VERSION"),
+    azure_endpoint=os.getenv("OPENAI_ENDPOINT")
+)
+
+embedding_model = os.getenv("OPENAI_EMBEDDING_DEPLOYMENT")
+
+# ✅ 임베딩 캐시 (PDF 가 바뀌지 않은 passage 는 다시 임베딩하지 않음)
+cache = open_default_cache()
+
+# ✅ 파일 경로 설정
+json_path = "data/solution_json/solution.json"
+pdf_dir = "data/solution_pdf"
+output_prefix = "data/preprocess_results/solution_passages"  # .npy + .jsonl
+passage_chars = int(os.getenv("SOLUTION_PASSAGE_CHARS", str(DEFAULT_PASSAGE_CHARS)))
+store_dtype = os.getenv("EMBEDDING_STORE_DTYPE", "float32")
+
+with open(json_path, 'r', encoding='utf-8') as f:
+    solutions = json.load(f)
+
+start = time.perf_counter()
+
+# ✅ 솔루션별 passage 생성 (소개 정보 passage 1개 + PDF 페이지별 passage)
+passages = []
+for solution in solutions:
+    pdf_path = os.path.join(pdf_dir, f"{solution['name']}.pdf")
+    pages = []
+    if os.path.exists(pdf_path):
+        extract_start = time.perf_counter()
+        pages = extract_pdf_pages(pdf_path)
+        report = page_report(pages, time.perf_counter() - extract_start)
+        print(f"[INFO] PDF 추출: {solution['name']}.pdf ({format_report(report)})")
+    solution_passages = list(iter_passages(solution, pages, max_chars=passage_chars))
+    passages.extend(solution_passages)
+    if pages and len(solution_passages) == 1:
+        print(f"[INFO] 텍스트 없는 PDF(이미지 등) → 소개 정보만 사용: {solution['name']}.pdf")
+
+# ✅ 배치 임베딩 (입력 순서 유지, 캐시 적중분은 요청 생략)
+embeddings = embed_texts(
+    client, embedding_model,
+    [f"{passage['name']}\n{passage['text']}" for passage in passages],
+    cache=cache
+)
+
+with VectorStoreWriter(output_prefix, dtype=store_dtype) as writer:
+    for passage, embedding in zip(passages, embeddings):
+        writer.write({**passage, "embedding": embedding})
+
+elapsed = time.perf_counter() - start
+print(f"[완료] solution_passages 저장 완료 → {output_prefix}.npy / {output_prefix}.jsonl")
+print(f"[INFO] 솔루션 {len(solutions)}건 / passage {len(passages)}개 / {elapsed:.1f}초")
+if cache is not None:
+    stats = cache.stats()
+    print(f"[INFO] 임베딩 캐시: hit {stats['hits']} / miss {stats['misses']}")
@@ -1,15 +1,40 @@
 import streamlit as st
 import os
 import json
-import requests
-import PyPDF2
-import fitz  # PyMuPDF
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
-from openai import AzureOpenAI
+from openai import AzureOpenAI, BadRequestError
+import sys
 import time
 import io
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.analysis import (
+    PARSE_PATHS,
+    ParseStats,
+    extract_json,
+    merge_analyses,
+    repair_prompt,
+    sample_chunks,
+    schema_json,
+    split_document,
+    validate_analysis
+)
+from common.embedding import embed_text, embed_texts
+from common.embedding_cache import open_default_cache
+from common.pdf_text import SERVER_START_METHOD, extract_pdf_text, format_report
+from common.prompt_budget import count_tokens, fill_budget, truncate_to_tokens
+from common.rank_fusion import RRF_SCORE, SCORE_TYPE_FIELD, fuse_result_lists
+from common.rerank import DEFAULT_BUDGET_MS, DEFAULT_CANDIDATES, normalize_client, parse_budget, rerank
+from common.diversify import DEFAULT_LAMBDA, DEFAULT_MMR_CANDIDATES, diversify
+from common.search_backend import PROJECT_INDEX, SOLUTION_INDEX, SOLUTION_PASSAGE_INDEX, create_search_backend
+from common.search_client import create_search_client
+from common.search_filters import FACET_FIELDS, build_filters
+from common.result_cache import ResultCache, content_key
+from common.semantic_cache import SemanticCache
+from common.solution import PASSAGE_CANDIDATE_FACTOR, PASSAGE_MIN_CANDIDATES, aggregate_passages
 
 # ✅ Streamlit 페이지 설정
 st.set_page_config(
@@ -130,11 +155,18 @@ if os.path.exists('.env'):
 # ✅ Azure Search 설정
 SEARCH_ENDPOINT = os.getenv("SEARCH_ENDPOINT")
 SEARCH_KEY = os.getenv("SEARCH_ADMIN_KEY")
-API_VERSION = "2023-10-01-Preview"
-HEADERS = {
-    "Content-Type": "application/json",
-    "api-key": SEARCH_KEY
-}
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", "10"))
+SEARCH_MAX_CONCURRENCY = int(os.getenv("SEARCH_POOL_SIZE", "10"))
+
+# ✅ Azure AI Search 클라이언트 (서버 프로세스 단위 keep-alive 커넥션 풀 공유)
+@st.cache_resource
+def get_search_client():
+    return create_search_client()
+
+# ✅ 검색 백엔드 (SEARCH_BACKEND=azure | local, 로컬은 프로세스당 1회 벡터 로드)
+@st.cache_resource
+def get_search_backend():
+    return create_search_backend(get_search_client())
 
 # ✅ Azure OpenAI 설정
 @st.cache_resource
@@ -145,6 +177,46 @@ def get_openai_client():
         azure_endpoint=os.getenv("OPENAI_ENDPOINT")
     )
 
+# ✅ 임베딩 캐시 (서버 프로세스 단위로 공유)
+@st.cache_resource
+def get_embedding_cache():
+    return open_default_cache()
+
+# ✅ 과업지시서 분석 결과 캐시 (문서 내용 해시 기준, 모든 세션이 공유)
+@st.cache_resource
+def get_analysis_cache():
+    return ResultCache(
+        max_entries=int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "128")),
+        ttl_seconds=float(os.getenv("ANALYSIS_CACHE_TTL_HOURS", "24")) * 3600,
+        persist_dir=os.getenv("ANALYSIS_CACHE_DIR") or None
+    )
+
+# ✅ 의미 기반 질의 캐시 (retrieval: 검색 질의 임베딩 → 검색 결과 / analysis: 문서 앞부분 임베딩 → 분석·검색 결과)
+@st.cache_resource
+def get_semantic_cache(name):
+    threshold = SEMANTIC_CACHE_ANALYSIS_THRESHOLD if name == "analysis" else SEMANTIC_CACHE_THRESHOLD
+    return SemanticCache(threshold=threshold, max_entries=SEMANTIC_CACHE_MAX_ENTRIES)
+
+# ✅ PDF 텍스트 추출 캐시 (업로드 파일 bytes 해시 기준, rerun 마다 다시 파싱하지 않음)
+#    페이지 구간별 병렬 추출 + 텍스트가 비어 있는 페이지만 PyPDF2 로 대체 추출
+@st.cache_data(max_entries=int(os.getenv("PDF_CACHE_MAX_ENTRIES", "32")), show_spinner=False)
+def extract_pdf_bytes(pdf_bytes):
+    return extract_pdf_text(pdf_bytes, start_method=SERVER_START_METHOD)
+
+# ✅ 프로젝트 검색 조건 선택지 (포트폴리오/고객사별 프로젝트 수, 10분 캐시)
+@st.cache_data(ttl=600, show_spinner=False)
+def get_project_facets():
+    try:
+        return get_search_backend().facets(PROJECT_INDEX, FACET_FIELDS)
+    except Exception as e:
+        print(f"[WARN] 프로젝트 패싯 조회 실패: {e}")
+        return {field: [] for field in FACET_FIELDS}
+
+# ✅ 분석 응답 파싱 경로별 횟수 (JSON 그대로 / 코드 블록 추출 / 복구 성공 / 복구 후 일부만 사용 / 실패)
+@st.cache_resource
+def get_parse_stats():
+    return ParseStats()
+
 client = get_openai_client()
 embedding_model = os.getenv("OPENAI_EMBEDDING_DEPLOYMENT")
 chat_model = os.getenv("OPENAI_CHAT_DEPLOYMENT")
@@ -159,51 +231,131 @@ def init_session_state():
         st.session_state.solutions_result = None
     if 'proposal_content' not in st.session_state:
         st.session_state.proposal_content = None
+    if 'retrieval_timings' not in st.session_state:
+        st.session_state.retrieval_timings = None
+    if 'requirement_coverage' not in st.session_state:
+        st.session_state.requirement_coverage = None
+    if 'analysis_metrics' not in st.session_state:
+        st.session_state.analysis_metrics = None
+    if 'proposal_metrics' not in st.session_state:
+        st.session_state.proposal_metrics = None
     if 'edit_mode' not in st.session_state:
         st.session_state.edit_mode = False
 
+# ✅ 분석 프롬프트/흐름이 바뀌면 올려서 기존 분석 캐시를 무효화
+ANALYSIS_PROMPT_VERSION = "3"
+
+# ✅ 제안서 프롬프트 근거(프로젝트/솔루션) 토큰 예산과 항목당 최대 토큰
+PROPOSAL_CONTEXT_TOKENS = int(os.getenv("PROPOSAL_CONTEXT_TOKENS", "700"))
+PROPOSAL_ITEM_TOKENS = int(os.getenv("PROPOSAL_ITEM_TOKENS", "150"))
+
+# ✅ 솔루션 검색 방식: summary(솔루션당 요약 벡터 1개) / passage(브로셔 passage 검색 후 솔루션 단위로 집계)
+SOLUTION_SEARCH = os.getenv("SOLUTION_SEARCH", "summary").lower()
+SOLUTION_PASSAGE_AGGREGATION = os.getenv("SOLUTION_PASSAGE_AGGREGATION", "max").lower()
+SOLUTION_PASSAGE_TOP_N = int(os.getenv("SOLUTION_PASSAGE_TOP_N", "3"))
+
+# ✅ 검색 질의 방식: single(분석 결과를 하나의 질의로 임베딩) / multi(주요 업무·기술 요구사항별 질의 + 가중 RRF 결합)
+QUERY_MODE = os.getenv("QUERY_MODE", "single").lower()
+MULTI_QUERY_MAX = int(os.getenv("MULTI_QUERY_MAX", "8"))
+# 요구사항 질의 가중치를 1 로 볼 때 전체 질의 가중치
+MULTI_QUERY_OVERALL_WEIGHT = float(os.getenv("MULTI_QUERY_OVERALL_WEIGHT", "1.0"))
+OVERALL_QUERY_LABEL = "전체"
+
+# ✅ 프로젝트 재순위화: 후보를 넉넉히 가져와 고객사·포트폴리오·최신성·계약금액·질의어 겹침으로 다시 정렬 (CPU, 시간 예산 내)
+RERANK = os.getenv("RERANK", "false").lower() == "true"
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", str(DEFAULT_CANDIDATES)))
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", str(DEFAULT_BUDGET_MS)))
+
+# ✅ 프로젝트 결과 다양화: 연도만 다른 같은 사업은 하나로 묶고, MMR(λ: 1=관련도만, 0=다양성만)로 서로 다른 이력 선택
+DIVERSIFY = os.getenv("DIVERSIFY", "false").lower() == "true"
+DIVERSIFY_COLLAPSE = os.getenv("DIVERSIFY_COLLAPSE", "true").lower() == "true"
+DIVERSIFY_CANDIDATES = int(os.getenv("DIVERSIFY_CANDIDATES", str(DEFAULT_MMR_CANDIDATES)))
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", str(DEFAULT_LAMBDA)))
+
+# ✅ 의미 기반 질의 캐시: 검색 질의 임베딩이 이전 질의와 임계값 이상 유사하면 검색 결과 재사용 (재공고·소폭 수정 과업지시서)
+#    근사 재사용이므로 기본 꺼짐 (사이드바의 적중률·유사도 분포로 임계값을 정한 뒤 사용)
+#    다중 질의 모드에서 요구사항별 질의가 있으면 결과(요구사항별 근거)가 문서의 요구사항에 묶여 있어 사용하지 않음
+SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "false").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.98"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "512"))
+# 분석 결과까지 재사용 (문서 앞부분 SEMANTIC_CACHE_DOC_CHARS 글자 임베딩 기준, 수정 내용을 놓칠 수 있어 기본 꺼짐)
+SEMANTIC_CACHE_ANALYSIS = os.getenv("SEMANTIC_CACHE_ANALYSIS", "false").lower() == "true"
+SEMANTIC_CACHE_ANALYSIS_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_ANALYSIS_THRESHOLD", "0.995"))
+SEMANTIC_CACHE_DOC_CHARS = int(os.getenv("SEMANTIC_CACHE_DOC_CHARS", "6000"))
+
+# ✅ 긴 과업지시서 청크 분석 설정 (청크 수 × 청크 크기로 토큰 사용량 상한, 전체 제한 시간)
+ANALYSIS_CHUNK_CHARS = int(os.getenv("ANALYSIS_CHUNK_CHARS", "6000"))
+ANALYSIS_MAX_CHUNKS = int(os.getenv("ANALYSIS_MAX_CHUNKS", "12"))
+# 분석에 넣을 전체 글자 수 상한 (넘으면 청크를 키우지 않고 문서 전체에서 고르게 골라 분석)
+ANALYSIS_MAX_CHARS = int(os.getenv("ANALYSIS_MAX_CHARS", str(ANALYSIS_CHUNK_CHARS * ANALYSIS_MAX_CHUNKS)))
+ANALYSIS_MAX_WORKERS = int(os.getenv("ANALYSIS_MAX_WORKERS", "4"))
+ANALYSIS_TIMEOUT = float(os.getenv("ANALYSIS_TIMEOUT", "120"))
+
 class TaskOrderProcessor:
+    # ✅ 분석 응답을 JSON 모드(response_format)로 요청 (미지원 API 버전이면 자동으로 해제)
+    json_mode = os.getenv("ANALYSIS_JSON_MODE", "true").lower() == "true"
+    
     def __init__(self):
         self.client = client
         self.embedding_model = embedding_model
         self.chat_model = chat_model
+        self.embedding_cache = get_embedding_cache()
+        self.search_backend = get_search_backend()
+        self.pdf_report = None
+        self.analysis_metrics = None
+        self.prompt_stats = None
+        self.parse_stats = get_parse_stats()
+        # 검색별 실패한 질의 수 (일부만 실패해도 결과가 불완전하므로 캐시하지 않음)
+        self.search_failures = {}
     
     def extract_text_from_pdf(self, pdf_file):
-        """PDF에서 텍스트 추출"""
+        """PDF에서 텍스트 추출 (같은 파일 내용은 캐시된 결과 재사용)"""
         try:
-            # PyMuPDF로 시도
-            pdf_bytes = pdf_file.read()
-            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-            text = ""
-            
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                text += page.get_text() + "\n"
-            
-            doc.close()
-            
-            if text.strip():
-                return text
-            
-            # PyPDF2로 재시도
-            pdf_file.seek(0)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text = ""
-            
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-            
+            text, self.pdf_report = extract_pdf_bytes(pdf_file.getvalue())
             return text
-            
         except Exception as e:
             st.error(f"PDF 텍스트 추출 실패: {str(e)}")
             return None
     
-    def analyze_task_order(self, document_text):
-        """과업지시서 분석"""
-        prompt = f"""
+    def analysis_cache_key(self, document_text, project_filters=None):
+        """분석 결과 캐시 키 (문서 내용 + 모델/프롬프트 버전 + 검색 설정)"""
+        return content_key(document_text, self.analysis_context_key(project_filters))
+    
+    def analysis_context_key(self, project_filters=None):
+        """문서 내용을 뺀 분석 결과 캐시 키 (의미 기반 분석 캐시는 같은 키 안에서만 비교)"""
+        return content_key(self.chat_model, ANALYSIS_PROMPT_VERSION, self.retrieval_cache_key(project_filters))
+    
+    def retrieval_cache_key(self, project_filters=None, rerank_query=None):
+        """검색 결과에 영향을 주는 설정 (임베딩 모델 + 검색 백엔드/모드 + 질의 방식·후처리 + 프로젝트 검색 조건)
+        
+        재순위화 시 발주처·과업예산이 결과 순서를 바꾸므로 함께 포함한다 (키워드 질의는 임베딩 유사도로 대신함).
+        """
+        rerank_context = None
+        if RERANK and rerank_query:
+            rerank_context = [normalize_client(rerank_query.get("client")), rerank_query.get("budget")]
+        return content_key(
+            self.embedding_model,
+            self.search_backend.name,
+            self.search_backend.mode,
+            SOLUTION_SEARCH,
+            SOLUTION_PASSAGE_AGGREGATION,
+            QUERY_MODE,
+            RERANK,
+            DIVERSIFY,
+            DIVERSIFY_COLLAPSE,
+            MMR_LAMBDA,
+            json.dumps(project_filters or {}, ensure_ascii=False, sort_keys=True),
+            json.dumps(rerank_context, ensure_ascii=False)
+        )
+    
+    def build_analysis_prompt(self, document_text, part=None, total=None):
+        """과업지시서 분석 프롬프트 (청크 분석 시 전체 중 몇 번째 부분인지 안내)"""
+        chunk_guide = ""
+        if total and total > 1:
+            chunk_guide = f"""- 아래 내용은 전체 과업지시서 {total}개 부분 중 {part}번째 부분입니다
+- 이 부분에 나오는 정보만 추출하고, 나오지 않는 항목은 빈 문자열("") 또는 빈 배열([])로 두세요
+"""
+        return f"""
 다음은 과업지시서입니다. 제안서 작성에 필요한 모든 핵심 정보를 JSON으로 추출해주세요.
 
 중요 지침:
@@ -211,70 +363,123 @@ class TaskOrderProcessor:
 - 관리자 정보는 이름만 추출 (연락처, 이메일 등 JSON 형태 제외)
 - 모든 텍스트는 읽기 쉬운 형태로 정리
 - 불필요한 기호나 태그는 모두 제거
-
+{chunk_guide}
 과업지시서 내용:
-{document_text[:5000]}
+{document_text}
 
 JSON 형식:
-{{
-    "project_info": {{
-        "project_title": "과업명/프로젝트명",
-        "client_organization": "발주처/고객사",
-        "project_period": "과업기간",
-        "project_budget": "과업예산",
-        "project_manager": "과업관리자 이름만",
-        "delivery_location": "결과물 납품장소"
-    }},
-    "objectives": {{
-        "main_purpose": "과업의 주요 목적",
-        "expected_outcomes": ["기대성과1", "기대성과2"],
-        "success_criteria": ["성공기준1", "성공기준2"]
-    }},
-    "scope_of_work": {{
-        "main_tasks": ["주요업무1", "주요업무2"],
-        "detailed_activities": ["세부활동1", "세부활동2"],
-        "exclusions": ["제외사항1", "제외사항2"]
-    }},
-    "technical_requirements": {{
-        "technologies": ["기술요구사항1", "기술요구사항2"],
-        "platforms": ["플랫폼1", "플랫폼2"],
-        "standards": ["표준/규격1", "표준/규격2"],
-        "security_requirements": ["보안요구사항1", "보안요구사항2"]
-    }},
-    "deliverables": {{
-        "documents": ["문서산출물1", "문서산출물2"],
-        "systems": ["시스템산출물1", "시스템산출물2"],
-        "reports": ["보고서1", "보고서2"]
-    }},
-    "timeline": {{
-        "phases": ["단계1", "단계2"],
-        "milestones": ["마일스톤1", "마일스톤2"],
-        "key_dates": ["주요일정1", "주요일정2"]
-    }},
-    "resources": {{
-        "required_roles": ["필요역할1", "필요역할2"],
-        "skill_requirements": ["필요기술1", "필요기술2"],
-        "equipment_needs": ["필요장비1", "필요장비2"]
-    }}
-}}
+{schema_json()}
 """
+    
+    def request_analysis_json(self, messages, timeout):
+        """분석용 chat 호출 (JSON 모드 우선, 지원하지 않는 API 버전이면 일반 모드로 재요청) → (응답 텍스트, 토큰 사용량)"""
+        request = {
+            "model": self.chat_model,
+            "messages": messages,
+            "temperature": 0.05,
+            "max_tokens": 2500,
+            "timeout": timeout
+        }
+        if TaskOrderProcessor.json_mode:
+            try:
+                response = self.client.chat.completions.create(
+                    response_format={"type": "json_object"}, **request
+                )
+            except BadRequestError as e:
+                if "response_format" not in str(e):
+                    raise
+                TaskOrderProcessor.json_mode = False
+                response = self.client.chat.completions.create(**request)
+        else:
+            response = self.client.chat.completions.create(**request)
         
-        response = self.client.chat.completions.create(
-            model=self.chat_model,
-            messages=[
-                {"role": "system", "content": "과업지시서 분석 전문가. 제안서 작성에 필요한 정보를 체계적으로 추출하며, HTML 태그나 불필요한 기호는 모두 제거하고 깔끔한 텍스트만 추출합니다."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.05,
-            max_tokens=2500
-        )
+        usage = response.usage
+        tokens = (usage.prompt_tokens, usage.completion_tokens) if usage else (0, 0)
+        return response.choices[0].message.content, tokens
+    
+    def analyze_chunk(self, chunk_text, part, total, timeout):
+        """청크 1개 분석 → (결과 dict 또는 None, 토큰 사용량, 파싱 경로) (스레드에서 실행되므로 st.* 호출 없음)
         
-        try:
-            result = json.loads(response.choices[0].message.content)
-            # 데이터 정제 함수 적용
-            return self.clean_analysis_data(result)
-        except:
+        응답이 스키마에 맞지 않으면 과업지시서 원문 없이 잘못된 출력만 보내 한 번 복구를 요청한다.
+        """
+        content, (prompt_tokens, completion_tokens) = self.request_analysis_json([
+            {"role": "system", "content": "과업지시서 분석 전문가. 제안서 작성에 필요한 정보를 체계적으로 추출하며, HTML 태그나 불필요한 기호는 모두 제거하고 깔끔한 텍스트만 추출합니다."},
+            {"role": "user", "content": self.build_analysis_prompt(chunk_text, part, total)}
+        ], timeout)
+        
+        data, path = extract_json(content)
+        result, errors = validate_analysis(data) if data is not None else (None, ["JSON 파싱 실패"])
+        if result is not None and not errors:
+            return result, (prompt_tokens, completion_tokens), path
+        
+        repaired, (repair_prompt_tokens, repair_completion_tokens) = self.request_analysis_json([
+            {"role": "system", "content": "JSON 형식 교정기. 주어진 출력을 요구한 JSON 형식에 맞게 고쳐 JSON 객체만 출력합니다."},
+            {"role": "user", "content": repair_prompt(content or "", errors)}
+        ], timeout)
+        tokens = (prompt_tokens + repair_prompt_tokens, completion_tokens + repair_completion_tokens)
+        
+        data, _ = extract_json(repaired)
+        repaired_result, repaired_errors = validate_analysis(data) if data is not None else (None, ["JSON 파싱 실패"])
+        if repaired_result is not None and not repaired_errors:
+            return repaired_result, tokens, "repaired"
+        # 복구 후에도 일부 항목만 잘못된 경우 보정된 나머지 항목은 사용
+        fallback = repaired_result or result
+        return fallback, tokens, "partial" if fallback else "failed"
+    
+    def analyze_task_order(self, document_text):
+        """과업지시서 분석 (긴 문서는 섹션 단위 청크로 나누어 동시 분석 후 병합)"""
+        started = time.perf_counter()
+        chunks = split_document(document_text, ANALYSIS_CHUNK_CHARS)
+        total_chunks = len(chunks)
+        # 청크는 최대 ANALYSIS_CHUNK_CHARS 글자이므로 청크 수 상한으로 전체 입력 글자 수를 제한
+        max_chunks = max(1, min(ANALYSIS_MAX_CHUNKS, ANALYSIS_MAX_CHARS // ANALYSIS_CHUNK_CHARS))
+        if total_chunks > max_chunks:
+            chunks = sample_chunks(chunks, max_chunks)
+            print(f"[WARN] 과업지시서가 분석 상한을 넘어 청크 {total_chunks}개 중 {max_chunks}개만 분석합니다.")
+            st.warning(f"⚠️ 과업지시서가 너무 길어 {total_chunks}개 부분 중 문서 전체에 고르게 {max_chunks}개 부분만 분석했습니다. "
+                       "(ANALYSIS_MAX_CHARS / ANALYSIS_MAX_CHUNKS)")
+        self.analysis_metrics = {
+            "chunks": len(chunks),
+            "skipped": total_chunks - len(chunks),
+            "failed": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "parse": {path: 0 for path in PARSE_PATHS},
+            "seconds": None
+        }
+        if not chunks:
+            return {"error": "분석 실패"}
+        
+        # 청크 순서대로 결과를 모아 병합 (완료 순서와 무관하게 항상 같은 결과)
+        results = [None] * len(chunks)
+        deadline = started + ANALYSIS_TIMEOUT
+        executor = ThreadPoolExecutor(max_workers=min(ANALYSIS_MAX_WORKERS, len(chunks)))
+        futures = [
+            executor.submit(self.analyze_chunk, chunk, part, len(chunks), ANALYSIS_TIMEOUT)
+            for part, chunk in enumerate(chunks, start=1)
+        ]
+        for index, future in enumerate(futures):
+            try:
+                results[index], (prompt_tokens, completion_tokens), path = future.result(
+                    timeout=max(0.0, deadline - time.perf_counter())
+                )
+                self.analysis_metrics["prompt_tokens"] += prompt_tokens
+                self.analysis_metrics["completion_tokens"] += completion_tokens
+            except Exception:
+                results[index], path = None, "failed"
+            if results[index] is None:
+                self.analysis_metrics["failed"] += 1
+            self.analysis_metrics["parse"][path] += 1
+            self.parse_stats.record(path)
+        # 시간 초과로 남은 청크는 기다리지 않음
+        executor.shutdown(wait=False, cancel_futures=True)
+        self.analysis_metrics["seconds"] = time.perf_counter() - started
+        
+        merged = merge_analyses(results)
+        if not merged:
             return {"error": "분석 실패"}
+        # 데이터 정제 함수 적용
+        return self.clean_analysis_data(merged)
     
     def clean_analysis_data(self, data):
         """분석 데이터 정제"""
@@ -318,63 +523,213 @@ JSON 형식:
         return clean_dict(data)
     
     def get_embedding(self, text):
-        """임베딩 생성"""
-        response = self.client.embeddings.create(
-            model=self.embedding_model,
-            input=text
-        )
-        return response.data[0].embedding
-    
-    def search_projects(self, query_embedding, top_k=6):
-        """프로젝트 검색"""
-        url = f"{SEARCH_ENDPOINT}/indexes/project-history-index/docs/search?api-version={API_VERSION}"
-        
-        search_body = {
-            "search": "*",
-            "vectorQueries": [
-                {
-                    "kind": "vector",
-                    "vector": query_embedding,
-                    "fields": "embedding",
-                    "k": top_k
-                }
-            ]
-        }
-        
+        """임베딩 생성 (캐시 적중 시 API 호출 생략)"""
+        return embed_text(self.client, self.embedding_model, text, cache=self.embedding_cache)
+    
+    def get_embeddings(self, texts):
+        """여러 질의 임베딩을 한 번의 배치 요청으로 생성 (입력 순서 유지, 캐시 적중분은 요청 생략)"""
+        return embed_texts(self.client, self.embedding_model, texts, cache=self.embedding_cache)
+    
+    def search_projects(self, query_embedding, top_k=6, query_text=None, filters=None):
+        """프로젝트 검색 (filters: 포트폴리오/고객사/착수일/계약금액 사전 필터)"""
         try:
-            response = requests.post(url, headers=HEADERS, json=search_body)
-            response.raise_for_status()
-            return response.json().get("value", [])
+            return self.search_backend.search(PROJECT_INDEX, query_embedding, top_k, query_text=query_text,
+                                              filters=filters)
         except Exception as e:
             st.error(f"프로젝트 검색 실패: {str(e)}")
             return []
     
-    def search_solutions(self, query_embedding, top_k=5):
+    def search_solution_index(self, query_embedding, top_k, timeout=None, query_text=None):
+        """솔루션 인덱스 검색 (passage 모드는 passage 후보를 넉넉히 가져와 솔루션 단위로 집계, 결과에 passages 포함)"""
+        if SOLUTION_SEARCH != "passage":
+            return self.search_backend.search(SOLUTION_INDEX, query_embedding, top_k, timeout=timeout,
+                                              query_text=query_text)
+        hits = self.search_backend.search(
+            SOLUTION_PASSAGE_INDEX, query_embedding, max(top_k * PASSAGE_CANDIDATE_FACTOR, PASSAGE_MIN_CANDIDATES),
+            timeout=timeout, query_text=query_text
+        )
+        return aggregate_passages(hits, top_k, method=SOLUTION_PASSAGE_AGGREGATION, top_n=SOLUTION_PASSAGE_TOP_N)
+    
+    def search_solutions(self, query_embedding, top_k=5, query_text=None):
         """솔루션 검색"""
-        url = f"{SEARCH_ENDPOINT}/indexes/solution-embedding-index/docs/search?api-version={API_VERSION}"
-        
-        search_body = {
-            "search": "*",
-            "vectorQueries": [
-                {
-                    "kind": "vector",
-                    "vector": query_embedding,
-                    "fields": "embedding",
-                    "k": top_k
-                }
-            ]
-        }
-        
         try:
-            response = requests.post(url, headers=HEADERS, json=search_body)
-            response.raise_for_status()
-            return response.json().get("value", [])
+            return self.search_solution_index(query_embedding, top_k, query_text=query_text)
         except Exception as e:
             st.error(f"솔루션 검색 실패: {str(e)}")
             return []
     
-    def generate_proposal(self, analysis, projects, solutions):
-        """최적화된 제안서 생성"""
+    def run_searches(self, queries, project_top_k=6, solution_top_k=5, timeout=SEARCH_TIMEOUT, project_filters=None,
+                     include_vectors=False):
+        """(질의 임베딩, 키워드 질의) 목록 × 프로젝트/솔루션 검색을 동시에 수행
+        
+        → ({"projects": 질의 순서의 결과 목록, "solutions": ...}, 검색별 소요 시간(초))
+        실패/시간 초과한 질의의 결과는 None, 모든 질의가 실패한 검색의 소요 시간은 None.
+        실패한 질의 수는 self.search_failures 에 누적된다.
+        query_text 는 하이브리드 모드(SEARCH_MODE=hybrid)에서 키워드 검색에 사용된다.
+        project_filters / include_vectors(결과에 embedding 포함)는 프로젝트 검색에만 적용된다.
+        """
+        def timed_search(index_name, top_k, filters, query_embedding, query_text):
+            start = time.perf_counter()
+            if index_name == SOLUTION_INDEX:
+                results = self.search_solution_index(query_embedding, top_k, timeout=timeout, query_text=query_text)
+            else:
+                results = self.search_backend.search(index_name, query_embedding, top_k, timeout=timeout,
+                                                     query_text=query_text, filters=filters,
+                                                     include_vectors=include_vectors)
+            return results, time.perf_counter() - start
+        
+        requests_by_name = {
+            "projects": (PROJECT_INDEX, project_top_k, project_filters, "프로젝트"),
+            "solutions": (SOLUTION_INDEX, solution_top_k, None, "솔루션"),
+        }
+        results = {name: [None] * len(queries) for name in requests_by_name}
+        timings = {name: None for name in requests_by_name}
+        errors = {}
+        
+        # 스레드 안에서는 st.* 를 호출하지 않고, 오류 표시는 메인 스레드에서 처리
+        # (동시 요청 수는 검색 커넥션 풀 크기 이내)
+        executor = ThreadPoolExecutor(max_workers=min(len(queries) * len(requests_by_name), SEARCH_MAX_CONCURRENCY))
+        futures = {
+            (name, i): executor.submit(timed_search, index_name, top_k, filters, query_embedding, query_text)
+            for i, (query_embedding, query_text) in enumerate(queries)
+            for name, (index_name, top_k, filters, _) in requests_by_name.items()
+        }
+        deadline = time.perf_counter() + timeout
+        for (name, i), future in futures.items():
+            try:
+                results[name][i], seconds = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+                timings[name] = max(timings[name] or 0.0, seconds)
+            except FutureTimeoutError:
+                errors.setdefault(name, f"시간 초과 ({timeout:.0f}초)")
+            except Exception as e:
+                errors.setdefault(name, str(e))
+        executor.shutdown(wait=False)
+        
+        for name, message in errors.items():
+            label = requests_by_name[name][3]
+            failed = sum(result is None for result in results[name])
+            self.search_failures[name] = self.search_failures.get(name, 0) + failed
+            if failed < len(queries):
+                st.warning(f"⚠️ {label} 검색 {len(queries)}건 중 {failed}건 실패: {message}")
+            elif "시간 초과" in message:
+                st.error(f"{label} 검색 {message}")
+            else:
+                st.error(f"{label} 검색 실패: {message}")
+        
+        return results, timings
+    
+    def build_rerank_query(self, analysis, keyword_query, project_filters=None):
+        """재순위화 질의 (키워드 + 발주처 + 과업예산 + 선택한 포트폴리오)"""
+        project_info = analysis.get('project_info', {})
+        return {
+            "text": keyword_query,
+            "client": project_info.get('client_organization', ''),
+            "budget": parse_budget(project_info.get('project_budget', '')),
+            "portfolio": (project_filters or {}).get("portfolio")
+        }
+    
+    def rerank_projects(self, candidates, rerank_query, top_k, timings):
+        """프로젝트 후보 재순위화 → 상위 top_k (소요 시간은 timings["rerank"] 에 기록)"""
+        projects, stats = rerank(candidates, rerank_query, top_k, budget_ms=RERANK_BUDGET_MS)
+        timings["rerank"] = stats["ms"] / 1000
+        if stats["skipped"]:
+            print(f"[WARN] 재순위화 시간 예산 {RERANK_BUDGET_MS:.0f}ms 초과 → 생략한 특징: {', '.join(stats['skipped'])}")
+        return projects
+    
+    def project_candidates(self, project_top_k, rerank_query=None):
+        """재순위화/다양화 설정에 따라 가져올 프로젝트 후보 수"""
+        fetch_k = project_top_k
+        if RERANK and rerank_query is not None:
+            fetch_k = max(fetch_k, RERANK_CANDIDATES)
+        if DIVERSIFY:
+            fetch_k = max(fetch_k, DIVERSIFY_CANDIDATES)
+        return fetch_k
+    
+    def postprocess_projects(self, candidates, top_k, rerank_query, timings):
+        """프로젝트 후보 후처리: 재순위화(RERANK) → 같은 사업 묶기 + MMR 다양화(DIVERSIFY) → 상위 top_k"""
+        if RERANK and rerank_query is not None:
+            candidates = self.rerank_projects(candidates, rerank_query, len(candidates) if DIVERSIFY else top_k,
+                                              timings)
+        if DIVERSIFY:
+            start = time.perf_counter()
+            candidates, stats = diversify(candidates, top_k, lambda_=MMR_LAMBDA, collapse=DIVERSIFY_COLLAPSE)
+            timings["diversify"] = time.perf_counter() - start
+            print(f"[INFO] 프로젝트 다양화: 후보 {stats['candidates']}건 / 동일 사업 {stats['collapsed']}건 묶음 / "
+                  f"유사도 {stats['similarity']}")
+        return candidates[:top_k]
+    
+    def retrieve(self, query_embedding, project_top_k=6, solution_top_k=5, timeout=SEARCH_TIMEOUT, query_text=None,
+                 project_filters=None, rerank_query=None):
+        """프로젝트/솔루션 동시 검색 → 두 결과와 검색별 소요 시간(초) 반환
+        
+        재순위화(RERANK=true) / 다양화(DIVERSIFY=true) 시 프로젝트 후보를 넉넉히 가져와 후처리한다.
+        """
+        results, timings = self.run_searches([(query_embedding, query_text)],
+                                             self.project_candidates(project_top_k, rerank_query), solution_top_k,
+                                             timeout, project_filters, include_vectors=DIVERSIFY)
+        projects = self.postprocess_projects(results["projects"][0] or [], project_top_k, rerank_query, timings)
+        return projects, results["solutions"][0] or [], timings
+    
+    def build_requirement_queries(self, analysis):
+        """다중 질의 검색용 요구사항 목록 (주요 업무 → 기술 요구사항 순, 중복 제거, 최대 MULTI_QUERY_MAX 개)"""
+        requirements = []
+        seen = set()
+        for kind, items in (
+            ("주요 업무", analysis.get('scope_of_work', {}).get('main_tasks', [])),
+            ("기술", analysis.get('technical_requirements', {}).get('technologies', []))
+        ):
+            for item in items:
+                text = ' '.join(str(item).split())
+                if text and text not in seen:
+                    seen.add(text)
+                    requirements.append({"kind": kind, "text": text})
+        return requirements[:MULTI_QUERY_MAX]
+    
+    def retrieve_multi(self, query_embeddings, requirements, keyword_query=None, project_top_k=6, solution_top_k=5,
+                       timeout=SEARCH_TIMEOUT, project_filters=None, rerank_query=None):
+        """전체 질의 + 요구사항별 질의로 동시 검색 후 가중 RRF 로 결합
+        
+        query_embeddings 는 [전체 질의, 요구사항1, 요구사항2, ...] 순서의 임베딩이다.
+        → (프로젝트, 솔루션, 요구사항별 근거 목록, 검색별 소요 시간) / 각 결과의 matched_queries 에 해당 문서를 찾은 요구사항 기록
+        """
+        labels = [OVERALL_QUERY_LABEL] + [requirement["text"] for requirement in requirements]
+        weights = [MULTI_QUERY_OVERALL_WEIGHT] + [1.0] * len(requirements)
+        # 질의마다 후보를 넉넉히 가져와 결합 (요구사항 하나에만 강하게 맞는 문서도 후보에 남도록)
+        results, timings = self.run_searches(
+            list(zip(query_embeddings, [keyword_query] + labels[1:])),
+            project_top_k * 2, solution_top_k * 2, timeout, project_filters, include_vectors=DIVERSIFY
+        )
+        
+        fused = {}
+        # 재순위화/다양화 시 결합 결과 상위 후보를 넉넉히 남겨 후처리
+        for name, top_k in (("projects", self.project_candidates(project_top_k, rerank_query)),
+                            ("solutions", solution_top_k)):
+            succeeded = [i for i, result in enumerate(results[name]) if result is not None]
+            fused[name] = fuse_result_lists(
+                [results[name][i] for i in succeeded],
+                weights=[weights[i] for i in succeeded],
+                labels=[labels[i] for i in succeeded],
+                top_k=top_k
+            )
+        fused["projects"] = self.postprocess_projects(fused["projects"], project_top_k, rerank_query, timings)
+        
+        # 요구사항 → 근거 매트릭스 (최종 결과 중 해당 요구사항 질의로 찾은 프로젝트/솔루션)
+        def answered(docs, requirement, name_field):
+            return [doc.get(name_field, '') for doc in docs
+                    if any(match["query"] == requirement["text"] for match in doc["matched_queries"])]
+        coverage = [
+            {
+                "kind": requirement["kind"],
+                "requirement": requirement["text"],
+                "projects": answered(fused["projects"], requirement, 'project_name'),
+                "solutions": answered(fused["solutions"], requirement, 'name')
+            }
+            for requirement in requirements
+        ]
+        return fused["projects"], fused["solutions"], coverage, timings
+    
+    def build_proposal_messages(self, analysis, projects, solutions):
+        """제안서 생성 프롬프트 구성"""
         
         project_info = analysis.get('project_info', {})
         objectives = analysis.get('objectives', {})
@@ -384,34 +739,6 @@ JSON 형식:
         timeline = analysis.get('timeline', {})
         resources = analysis.get('resources', {})
         
-        # 프로젝트 경험을 더 구체적으로 정리
-        project_experience_detail = []
-        for proj in projects[:4]:  # 상위 4개만 사용
-            name = proj.get('project_name', 'Unknown')
-            dept = proj.get('department', 'N/A')
-            score = proj.get('@search.score', 0)
-            detail = proj.get('description', '') or proj.get('summary', '')
-            project_experience_detail.append({
-                'name': name,
-                'department': dept,
-                'score': score,
-                'detail': detail[:200] if detail else ''
-            })
-        
-        # 솔루션을 더 구체적으로 정리
-        solution_capabilities_detail = []
-        for sol in solutions[:3]:  # 상위 3개만 사용
-            name = sol.get('name', 'Unknown')
-            desc = sol.get('description', '')
-            score = sol.get('@search.score', 0)
-            benefits = sol.get('benefits', '') or sol.get('features', '')
-            solution_capabilities_detail.append({
-                'name': name,
-                'description': desc[:300] if desc else '',
-                'score': score,
-                'benefits': benefits[:200] if benefits else ''
-            })
-        
         # 핵심 키워드 추출
         core_keywords = []
         if technical_requirements.get('technologies'):
@@ -443,21 +770,68 @@ JSON 형식:
         documents = ', '.join(deliverables.get('documents', []))
         systems = ', '.join(deliverables.get('systems', []))
         
-        # 프로젝트 경험 문자열 생성
-        project_experience_text = ""
-        for i, proj in enumerate(project_experience_detail, 1):
-            project_experience_text += f"**{i}. {proj['name']}**\n"
-            project_experience_text += f"   - 담당부서: {proj['department']}\n"
-            project_experience_text += f"   - 유사도: {proj['score']:.1%}\n"
-            project_experience_text += f"   - 상세: {proj['detail'][:150]}\n\n"
-        
-        # 솔루션 역량 문자열 생성
-        solution_capabilities_text = ""
-        for i, sol in enumerate(solution_capabilities_detail, 1):
-            solution_capabilities_text += f"**{i}. {sol['name']}**\n"
-            solution_capabilities_text += f"   - 적합도: {sol['score']:.1%}\n"
-            solution_capabilities_text += f"   - 솔루션 개요: {sol['description'][:200]}\n"
-            solution_capabilities_text += f"   - 핵심 강점: {sol['benefits'][:150]}\n\n"
+        # 프로젝트 경험 / 솔루션 역량: 관련도 점수가 높은 순서로 토큰 예산 안에서 선택 (본문은 문장 단위로 자름)
+        def requirement_line(doc):
+            # 다중 질의 검색 시 이 근거가 대응하는 요구사항
+            requirements = [match["query"] for match in doc.get("matched_queries", [])
+                            if match["query"] != OVERALL_QUERY_LABEL]
+            return f"   - 대응 요구사항: {', '.join(requirements[:3])}\n" if requirements else ""
+        
+        def score_line(entry, label):
+            # RRF 점수(하이브리드/다중 질의)는 순위에서 나온 작은 값이므로 유사도(%) 대신 검색 순위로 전달
+            if entry["doc"].get(SCORE_TYPE_FIELD) == RRF_SCORE:
+                return f"   - 검색 순위: {entry['rank'] + 1}위\n"
+            return f"   - {label}: {entry['doc'].get('@search.score', 0):.1%}\n"
+        
+        def render_evidence(entry):
+            doc = entry["doc"]
+            if entry["kind"] == "project":
+                header = (
+                    f"**• {doc.get('project_name', 'Unknown')}**\n"
+                    f"   - 담당부서: {doc.get('department', 'N/A')}\n"
+                    f"{score_line(entry, '유사도')}"
+                    f"{requirement_line(doc)}"
+                    + (f"   - 동일 사업 다른 연도/차수 수행: {len(doc['duplicates'])}건\n" if doc.get('duplicates') else "")
+                    + f"   - 상세: "
+                )
+                return header, doc.get('description', '') or doc.get('summary', '') or doc.get('summary_text', '')
+            
+            benefits = doc.get('benefits', '') or doc.get('features', '')
+            if isinstance(benefits, list):
+                benefits = ', '.join(benefits)
+            header = (
+                f"**• {doc.get('name', 'Unknown')}**\n"
+                f"{score_line(entry, '적합도')}"
+                f"{requirement_line(doc)}"
+                f"   - 솔루션 개요: "
+            )
+            if doc.get('passages'):
+                # passage 검색 결과: 개요는 짧게, 요구사항과 가장 잘 맞는 브로셔 내용을 출처 페이지와 함께 인용
+                header += truncate_to_tokens(doc.get('description', '') or '', PROPOSAL_ITEM_TOKENS // 3) + "\n"
+                return header, "\n".join(passage_line(passage) for passage in doc['passages'])
+            detail = doc.get('description', '') or ''
+            if benefits:
+                detail += f"\n   - 핵심 강점: {benefits}"
+            return header, detail
+        
+        def passage_line(passage):
+            source = f"브로셔 p.{passage['page']}" if passage['page'] else "솔루션 소개"
+            return f"   - 근거({source}): {' '.join(passage['text'].split())}"
+        
+        # 두 인덱스의 점수는 서로 비교할 수 없으므로 각 목록의 순위끼리 번갈아 배치 (1위 프로젝트, 1위 솔루션, 2위 ...)
+        #    목록은 이미 최종 순서(재순위화·다양화 반영)이므로 1차 검색 점수로 다시 정렬하지 않음
+        evidence = [
+            {"kind": kind, "doc": doc, "rank": rank}
+            for kind, docs in (("project", projects), ("solution", solutions))
+            for rank, doc in enumerate(docs)
+        ]
+        evidence.sort(key=lambda entry: entry["rank"])
+        selected, context_tokens = fill_budget(
+            evidence, render_evidence, PROPOSAL_CONTEXT_TOKENS, item_tokens=PROPOSAL_ITEM_TOKENS
+        )
+        
+        project_experience_text = "".join(f"{text}\n\n" for entry, text in selected if entry["kind"] == "project")
+        solution_capabilities_text = "".join(f"{text}\n\n" for entry, text in selected if entry["kind"] == "solution")
         
         # 개선된 구조화 프롬프트
         prompt = f"""
@@ -610,18 +984,60 @@ JSON 형식:
 
 매번 수주에 성공하는 **설득력 있는 제안서**를 작성하세요."""
         
+        prompt_tokens = count_tokens(system_prompt) + count_tokens(prompt)
+        self.prompt_stats = {
+            "prompt_tokens": prompt_tokens,
+            "context_tokens": context_tokens,
+            "projects": sum(1 for entry, _ in selected if entry["kind"] == "project"),
+            "solutions": sum(1 for entry, _ in selected if entry["kind"] == "solution")
+        }
+        print(f"[INFO] 제안서 프롬프트 {prompt_tokens} 토큰 (근거 {context_tokens}/{PROPOSAL_CONTEXT_TOKENS} 토큰, "
+              f"프로젝트 {self.prompt_stats['projects']}건 / 솔루션 {self.prompt_stats['solutions']}건)")
+        
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def generate_proposal(self, analysis, projects, solutions):
+        """최적화된 제안서 생성"""
         response = self.client.chat.completions.create(
             model=self.chat_model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
+            messages=self.build_proposal_messages(analysis, projects, solutions),
             temperature=0.15,  # 창의성과 일관성의 균형
             max_tokens=4500,   # 더 상세한 내용
             top_p=0.9         # 다양성 확보
         )
         
         return response.choices[0].message.content
+    
+    def stream_proposal(self, analysis, projects, solutions):
+        """제안서 스트리밍 생성 (토큰이 도착하는 대로 반환)
+        
+        생성이 끝나면 self.generation_metrics 에 첫 토큰 시간(ttft)과 전체 생성 시간(total)을 기록한다.
+        """
+        start = time.perf_counter()
+        messages = self.build_proposal_messages(analysis, projects, solutions)
+        self.generation_metrics = {"ttft": None, "total": None, "prompt_tokens": self.prompt_stats["prompt_tokens"]}
+        
+        stream = self.client.chat.completions.create(
+            model=self.chat_model,
+            messages=messages,
+            temperature=0.15,
+            max_tokens=4500,
+            top_p=0.9,
+            stream=True
+        )
+        
+        for chunk in stream:
+            # Azure 는 콘텐츠 필터 결과 등 choices 가 비어 있는 청크를 보내기도 함
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            if self.generation_metrics["ttft"] is None:
+                self.generation_metrics["ttft"] = time.perf_counter() - start
+            yield chunk.choices[0].delta.content
+        
+        self.generation_metrics["total"] = time.perf_counter() - start
 
 def display_analysis_results(analysis):
     """분석 결과 표시 - 깔끔한 카드 형태"""
@@ -822,6 +1238,20 @@ def display_analysis_results(analysis):
         </div>
         """, unsafe_allow_html=True)
 
+def matched_requirements_html(doc):
+    """다중 질의 검색 결과의 대응 요구사항 표시 (전체 질의 제외)"""
+    requirements = [match["query"] for match in doc.get("matched_queries", []) if match["query"] != OVERALL_QUERY_LABEL]
+    if not requirements:
+        return ""
+    return f"<br><small>🎯 대응 요구사항: {', '.join(requirements)}</small>"
+
+def score_label(doc, score=None):
+    """결과 카드 점수 표시 (RRF 점수는 유사도가 아니므로 '순위 점수'로 구분)"""
+    score = doc.get('@search.score', 0) if score is None else score
+    if doc.get(SCORE_TYPE_FIELD) == RRF_SCORE:
+        return f"순위 점수: {score:.4f}"
+    return f"매칭도: {score:.3f}"
+
 def display_matching_results(projects, solutions):
     """매칭 결과 표시"""
     st.markdown("### 🎯 자사 역량 매칭 결과")
@@ -835,12 +1265,11 @@ def display_matching_results(projects, solutions):
             for i, proj in enumerate(projects, 1):
                 name = proj.get('project_name', 'Unknown')
                 dept = proj.get('department', 'N/A')
-                score = proj.get('@search.score', 0)
                 
                 st.markdown(f"""
                 <div class="feature-card">
                     <strong>{i}. {name}</strong><br>
-                    <small>부서: {dept} | 매칭도: {score:.3f}</small>
+                    <small>부서: {dept} | {score_label(proj)}{f" | 동일 사업 외 {len(proj['duplicates'])}건" if proj.get('duplicates') else ""}</small>{matched_requirements_html(proj)}
                 </div>
                 """, unsafe_allow_html=True)
         else:
@@ -852,7 +1281,6 @@ def display_matching_results(projects, solutions):
         if solutions:
             for i, sol in enumerate(solutions, 1):
                 name = sol.get('name', 'Unknown')
-                score = sol.get('@search.score', 0)
                 full_desc = sol.get('description', '')
 
                 cutoff = full_desc.find(".")
@@ -864,10 +1292,18 @@ def display_matching_results(projects, solutions):
                 st.markdown(f"""
                 <div class="feature-card">
                     <strong>{i}. {name}</strong><br>
-                    <small>매칭도: {score:.3f}</small><br>
+                    <small>{score_label(sol)}</small>{matched_requirements_html(sol)}<br>
                     <p style="margin-top: 8px; font-size: 0.9em;">{desc}</p>
                 """, unsafe_allow_html=True)
-                
+
+                # passage 검색 결과면 가장 잘 맞는 브로셔 내용 표시
+                if sol.get('passages'):
+                    with st.expander("📎 관련 내용"):
+                        for passage in sol['passages']:
+                            source = f"p.{passage['page']}" if passage['page'] else "솔루션 소개"
+                            st.caption(f"{source} · {score_label(sol, passage['score'])}")
+                            st.text(passage['text'][:300])
+
                 if pdf_available:
                     with open(pdf_path, "rb") as f:
                         pdf_bytes = f.read()
@@ -885,6 +1321,26 @@ def display_matching_results(projects, solutions):
         else:
             st.info("관련 솔루션을 찾을 수 없습니다.")
 
+def display_requirement_coverage(coverage):
+    """요구사항별 근거 매트릭스 (다중 질의 검색 시)"""
+    st.markdown("#### 🧭 요구사항별 근거")
+    st.dataframe(
+        [
+            {
+                "구분": row["kind"],
+                "요구사항": row["requirement"],
+                "관련 프로젝트": ", ".join(row["projects"]) or "-",
+                "관련 솔루션": ", ".join(row["solutions"]) or "-"
+            }
+            for row in coverage
+        ],
+        use_container_width=True,
+        hide_index=True
+    )
+    uncovered = sum(1 for row in coverage if not row["projects"] and not row["solutions"])
+    if uncovered:
+        st.caption(f"⚠️ 근거를 찾지 못한 요구사항 {uncovered}건 — 제안서에서 보완 방안을 제시하세요.")
+
 def display_proposal_with_enhanced_ui(proposal_content):
     """개선된 제안서 표시 UI"""
     
@@ -978,6 +1434,27 @@ def display_editable_proposal(proposal_content):
             st.session_state.edit_mode = False
             st.rerun()
 
+def display_semantic_cache_stats():
+    """의미 기반 질의 캐시 적중률 + 최고 유사도 분포 (임계값 조정용)"""
+    for name, label, enabled in (("retrieval", "검색", SEMANTIC_CACHE), ("analysis", "분석", SEMANTIC_CACHE_ANALYSIS)):
+        if not enabled:
+            continue
+        stats = get_semantic_cache(name).stats()
+        if not stats["lookups"]:
+            continue
+        similarity = stats["similarity"]
+        st.caption(
+            f"🧠 유사 질의 캐시({label}) — 적중률 {stats['hit_rate']:.0%} ({stats['hits']}/{stats['lookups']}) / "
+            f"{stats['entries']}/{stats['capacity']}건 / 임계값 {stats['threshold']:.3f}"
+            + (f" / 유사도 p50 {similarity['p50']:.3f} · p90 {similarity['p90']:.3f}" if similarity else "")
+        )
+        if stats["histogram"]:
+            with st.expander(f"유사도 분포 ({label})"):
+                st.dataframe(
+                    [{"최고 유사도": f"{low:.2f}~{high:.2f}", "조회 수": count} for low, high, count in stats["histogram"]],
+                    hide_index=True, use_container_width=True
+                )
+
 def main():
     init_session_state()
     
@@ -1017,7 +1494,9 @@ def main():
         """)
         
         st.markdown("### 📊 시스템 상태")
-        if SEARCH_ENDPOINT and SEARCH_KEY:
+        if get_search_backend().name == "local":
+            st.success("✅ 로컬 벡터 검색 사용 중")
+        elif SEARCH_ENDPOINT and SEARCH_KEY:
             st.success("✅ Azure AI Search 연결됨")
         else:
             st.error("❌ Azure AI Search 연결 실패")
@@ -1026,6 +1505,15 @@ def main():
             st.success("✅ Azure OpenAI 연결됨")
         else:
             st.error("❌ Azure OpenAI 연결 실패")
+        
+        parse_counts = get_parse_stats().snapshot()
+        if any(parse_counts.values()):
+            st.caption(
+                f"🧾 분석 응답 파싱 — JSON {parse_counts['json']} / 추출 {parse_counts['extracted']} / "
+                f"복구 {parse_counts['repaired']} / 일부 {parse_counts['partial']} / 실패 {parse_counts['failed']}"
+            )
+        
+        display_semantic_cache_stats()
     
     # 메인 컨텐츠
     tab1, tab2, tab3 = st.tabs(["📄 과업지시서 분석", "🔍 분석 결과", "📝 제안서"])
@@ -1079,6 +1567,11 @@ def main():
                 
                 if document_text:
                     st.success(f"✅ 텍스트 추출 완료 ({len(document_text)} 글자)")
+                    report = processor.pdf_report
+                    if report:
+                        st.caption(f"⏱️ {format_report(report)}")
+                        if report["empty_pages"]:
+                            st.warning(f"⚠️ 텍스트를 추출하지 못한 페이지(이미지 등): {report['empty_pages']}")
                     
                     with st.expander("📋 추출된 텍스트 미리보기"):
                         st.text_area(
@@ -1098,6 +1591,35 @@ def main():
                 help="HWP 파일을 열어서 내용을 복사해서 붙여넣으세요"
             )
         
+        # 프로젝트 검색 조건 (선택 시 해당 조건의 프로젝트 중에서만 유사 이력 검색)
+        with st.expander("🔎 프로젝트 검색 조건"):
+            facets = get_project_facets()
+            filter_col1, filter_col2 = st.columns(2)
+            with filter_col1:
+                selected_portfolios = st.multiselect(
+                    "포트폴리오",
+                    [value for value, _ in facets.get("portfolio", [])],
+                    format_func=lambda value: f"{value} ({dict(facets['portfolio'])[value]})"
+                )
+                recent_years = st.selectbox(
+                    "착수 시기",
+                    [None, 1, 3, 5, 10],
+                    format_func=lambda years: "전체" if years is None else f"최근 {years}년"
+                )
+            with filter_col2:
+                selected_clients = st.multiselect(
+                    "고객사",
+                    [value for value, _ in facets.get("client", [])],
+                    format_func=lambda value: f"{value} ({dict(facets['client'])[value]})"
+                )
+                min_amount = st.number_input("최소 계약금액 (원)", min_value=0, value=0, step=10000000)
+        project_filters = build_filters(
+            portfolio=selected_portfolios,
+            client=selected_clients,
+            recent_years=recent_years,
+            min_amount=min_amount or None
+        )
+        
         # 분석 버튼
         if document_text and st.button("🔍 과업지시서 분석 시작", type="primary", use_container_width=True):
             
@@ -1105,72 +1627,182 @@ def main():
             st.session_state.analysis_result = None
             st.session_state.projects_result = None
             st.session_state.solutions_result = None
+            st.session_state.retrieval_timings = None
+            st.session_state.requirement_coverage = None
+            st.session_state.analysis_metrics = None
             st.session_state.proposal_content = None  # 제안서도 초기화
-            
-            # 진행률 표시
-            progress_bar = st.progress(0)
-            status_text = st.empty()
+            st.session_state.proposal_metrics = None
             
             processor = TaskOrderProcessor()
+            analysis_cache = get_analysis_cache()
+            cache_key = processor.analysis_cache_key(document_text, project_filters)
+            cached = analysis_cache.get(cache_key)
             
-            # 1. 과업지시서 분석
-            status_text.text("🔍 과업지시서 분석 중...")
-            progress_bar.progress(20)
+            # 내용이 조금 다른 과업지시서(재공고 등)는 문서 앞부분 임베딩이 충분히 비슷하면 기존 결과 재사용
+            document_embedding = None
+            document_similarity = None
+            if cached is None and SEMANTIC_CACHE_ANALYSIS:
+                document_embedding = processor.get_embedding(document_text[:SEMANTIC_CACHE_DOC_CHARS])
+                cached, document_similarity = get_semantic_cache("analysis").get(
+                    document_embedding, processor.analysis_context_key(project_filters))
             
-            analysis = processor.analyze_task_order(document_text)
+            if cached is not None:
+                st.session_state.analysis_result = cached["analysis"]
+                st.session_state.projects_result = cached["projects"]
+                st.session_state.solutions_result = cached["solutions"]
+                st.session_state.requirement_coverage = cached.get("coverage")
+                if document_embedding is not None:
+                    print(f"[INFO] 유사 과업지시서 분석 결과 재사용 (유사도 {document_similarity:.4f})")
+                    st.success(f"♻️ 유사한 과업지시서(유사도 {document_similarity:.3f})의 기존 분석 결과를 재사용했습니다! "
+                               "'분석 결과' 탭에서 확인하세요.")
+                else:
+                    st.success("♻️ 동일한 과업지시서의 기존 분석 결과를 재사용했습니다! '분석 결과' 탭에서 확인하세요.")
             
-            if "error" not in analysis:
-                progress_bar.progress(40)
-                st.session_state.analysis_result = analysis
-                
-                # 2. 자사 역량 검색
-                status_text.text("🔍 자사 역량 검색 중...")
-                progress_bar.progress(60)
-                
-                project_info = analysis.get('project_info', {})
-                objectives = analysis.get('objectives', {})
-                scope_of_work = analysis.get('scope_of_work', {})
-                technical_requirements = analysis.get('technical_requirements', {})
-                
-                # 검색 쿼리 생성
-                search_query = f"""
-                {project_info.get('project_title', '')}
-                {objectives.get('main_purpose', '')}
-                {' '.join(scope_of_work.get('main_tasks', []))}
-                {' '.join(technical_requirements.get('technologies', []))}
-                """
-                
-                embedding = processor.get_embedding(search_query)
-                
-                projects = processor.search_projects(embedding)
-                solutions = processor.search_solutions(embedding)
-                
-                progress_bar.progress(80)
-                
-                st.session_state.projects_result = projects
-                st.session_state.solutions_result = solutions
-                
-                progress_bar.progress(100)
-                status_text.text("✅ 분석 완료!")
+            else:
+                # 진행률 표시
+                progress_bar = st.progress(0)
+                status_text = st.empty()
                 
-                time.sleep(1)
-                progress_bar.empty()
-                status_text.empty()
+                # 1. 과업지시서 분석
+                status_text.text("🔍 과업지시서 분석 중...")
+                progress_bar.progress(20)
                 
-                st.success("🎉 과업지시서 분석이 완료되었습니다! '분석 결과' 탭에서 확인하세요.")
+                analysis = processor.analyze_task_order(document_text)
+                st.session_state.analysis_metrics = processor.analysis_metrics
                 
-            else:
-                st.error("❌ 과업지시서 분석에 실패했습니다.")
+                if "error" not in analysis:
+                    progress_bar.progress(40)
+                    st.session_state.analysis_result = analysis
+                    
+                    # 2. 자사 역량 검색
+                    status_text.text("🔍 자사 역량 검색 중...")
+                    progress_bar.progress(60)
+                    
+                    project_info = analysis.get('project_info', {})
+                    objectives = analysis.get('objectives', {})
+                    scope_of_work = analysis.get('scope_of_work', {})
+                    technical_requirements = analysis.get('technical_requirements', {})
+                    
+                    # 검색 쿼리 생성
+                    search_query = f"""
+                    {project_info.get('project_title', '')}
+                    {objectives.get('main_purpose', '')}
+                    {' '.join(scope_of_work.get('main_tasks', []))}
+                    {' '.join(technical_requirements.get('technologies', []))}
+                    """
+                    
+                    # 하이브리드 검색용 키워드 질의 (고객사명, 시스템명, 기술명 등 정확히 일치하는 단어 가중)
+                    keyword_query = ' '.join([
+                        project_info.get('project_title', ''),
+                        project_info.get('client_organization', ''),
+                        ' '.join(scope_of_work.get('main_tasks', [])),
+                        ' '.join(technical_requirements.get('technologies', []))
+                    ])
+                    
+                    coverage = None
+                    rerank_query = processor.build_rerank_query(analysis, keyword_query, project_filters)
+                    requirements = processor.build_requirement_queries(analysis) if QUERY_MODE == "multi" else []
+                    embedding = processor.get_embedding(search_query)
+                    
+                    # 이전 검색 질의와 임베딩이 임계값 이상 유사하면 검색/재순위화 생략
+                    #    (요구사항별 질의 결과는 다른 문서의 요구사항이 섞이므로 제외)
+                    use_semantic_cache = SEMANTIC_CACHE and not requirements
+                    retrieval_key = processor.retrieval_cache_key(project_filters, rerank_query)
+                    cached_retrieval = None
+                    if use_semantic_cache:
+                        cached_retrieval, similarity = get_semantic_cache("retrieval").get(embedding, retrieval_key)
+                    
+                    if cached_retrieval is not None:
+                        print(f"[INFO] 유사 검색 질의 결과 재사용 (유사도 {similarity:.4f})")
+                        projects = cached_retrieval["projects"]
+                        solutions = cached_retrieval["solutions"]
+                        coverage = cached_retrieval["coverage"]
+                        timings = {"projects": 0.0, "solutions": 0.0, "semantic_cache": similarity}
+                    elif requirements:
+                        # 전체 질의 + 요구사항별 질의를 한 번의 배치로 임베딩 → 모든 검색을 동시에 수행 후 가중 RRF 결합
+                        #    (전체 질의 임베딩은 캐시 적중이라 요구사항 질의만 요청)
+                        embeddings = processor.get_embeddings([search_query] + [r["text"] for r in requirements])
+                        projects, solutions, coverage, timings = processor.retrieve_multi(
+                            embeddings, requirements, keyword_query=keyword_query, project_filters=project_filters,
+                            rerank_query=rerank_query
+                        )
+                    else:
+                        # 프로젝트/솔루션 검색을 동시에 수행 (지연시간 = 두 검색 중 느린 쪽)
+                        projects, solutions, timings = processor.retrieve(embedding, query_text=keyword_query,
+                                                                          project_filters=project_filters,
+                                                                          rerank_query=rerank_query)
+                    
+                    progress_bar.progress(80)
+                    
+                    st.session_state.projects_result = projects
+                    st.session_state.solutions_result = solutions
+                    st.session_state.retrieval_timings = timings
+                    st.session_state.requirement_coverage = coverage
+                        
+                    # 검색까지 모두 성공한 결과만 캐시 (동일 문서 재분석 시 LLM/검색 호출 생략)
+                    #    다중 질의 중 일부만 실패한 결과도 불완전하므로 캐시하지 않음
+                    if all(t is not None for t in timings.values()) and not processor.search_failures:
+                        result = {
+                            "analysis": analysis,
+                            "query_embedding": embedding,
+                            "projects": projects,
+                            "solutions": solutions,
+                            "coverage": coverage
+                        }
+                        analysis_cache.put(cache_key, result)
+                        if use_semantic_cache and cached_retrieval is None:
+                            get_semantic_cache("retrieval").put(embedding, result, retrieval_key)
+                        if document_embedding is not None:
+                            get_semantic_cache("analysis").put(document_embedding, result,
+                                                               processor.analysis_context_key(project_filters))
+                    
+                    progress_bar.progress(100)
+                    status_text.text("✅ 분석 완료!")
+                    
+                    time.sleep(1)
+                    progress_bar.empty()
+                    status_text.empty()
+                    
+                    st.success("🎉 과업지시서 분석이 완료되었습니다! '분석 결과' 탭에서 확인하세요.")
+                    
+                else:
+                    st.error("❌ 과업지시서 분석에 실패했습니다.")
     
     with tab2:
         if st.session_state.analysis_result:
             display_analysis_results(st.session_state.analysis_result)
             
+            metrics = st.session_state.analysis_metrics
+            if metrics and metrics.get("seconds") is not None:
+                st.caption(
+                    f"⏱️ 분석 {metrics['seconds']:.1f}초 / 청크 {metrics['chunks']}개"
+                    + (f" (상한 초과로 {metrics['skipped']}개 제외)" if metrics.get('skipped') else "")
+                    + (f" (실패 {metrics['failed']}개)" if metrics['failed'] else "")
+                    + f" / 토큰 입력 {metrics['prompt_tokens']:,} · 출력 {metrics['completion_tokens']:,}"
+                    + (f" / 응답 복구 {metrics['parse']['repaired']}회" if metrics['parse']['repaired'] else "")
+                    + (f" / 복구 후 일부 항목만 사용 {metrics['parse']['partial']}회" if metrics['parse']['partial'] else "")
+                )
+            
             if st.session_state.projects_result is not None and st.session_state.solutions_result is not None:
                 # 구분선 추가
                 st.markdown("---")
                 st.markdown("")  # 여백 추가
                 display_matching_results(st.session_state.projects_result, st.session_state.solutions_result)
+                
+                timings = st.session_state.retrieval_timings
+                if timings:
+                    def format_timing(seconds):
+                        return f"{seconds:.2f}초" if seconds is not None else "실패"
+                    st.caption(
+                        f"⏱️ 검색 소요 시간 — 프로젝트 {format_timing(timings['projects'])} / 솔루션 {format_timing(timings['solutions'])}"
+                        + (f" / 재순위화 {timings['rerank'] * 1000:.1f}ms" if timings.get('rerank') is not None else "")
+                        + (f" / 다양화 {timings['diversify'] * 1000:.1f}ms" if timings.get('diversify') is not None else "")
+                        + (f" / 유사 질의 캐시 재사용 (유사도 {timings['semantic_cache']:.3f})"
+                           if timings.get('semantic_cache') is not None else "")
+                    )
+                
+                if st.session_state.requirement_coverage:
+                    display_requirement_coverage(st.session_state.requirement_coverage)
         else:
             st.info("먼저 과업지시서를 업로드하고 분석을 시작해주세요.")
     
@@ -1187,6 +1819,13 @@ def main():
             elif st.session_state.proposal_content:
                 display_proposal_with_enhanced_ui(st.session_state.proposal_content)
                 
+                metrics = st.session_state.proposal_metrics
+                if metrics and metrics.get("ttft") is not None:
+                    st.caption(
+                        f"⏱️ 첫 토큰 {metrics['ttft']:.1f}초 / 전체 생성 {metrics['total']:.1f}초"
+                        + (f" / 입력 {metrics['prompt_tokens']:,} 토큰" if metrics.get('prompt_tokens') else "")
+                    )
+                
                 # 성공 메시지
                 st.markdown("""
                 <div class="completion-box">
@@ -1208,39 +1847,20 @@ def main():
                 # 제안서 생성 버튼
                 if st.button("🚀 AI 제안서 생성 시작", type="primary", use_container_width=True, key="generate_proposal"):
                     
-                    # 진행률 표시
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
-                    
-                    status_text.text("🤖 AI가 제안서를 생성하고 있습니다...")
-                    progress_bar.progress(20)
-                    
                     processor = TaskOrderProcessor()
                     
-                    status_text.text("📊 과업 정보 분석 중...")
-                    progress_bar.progress(40)
+                    st.markdown("---")
                     
-                    status_text.text("💼 프로젝트 경험 정리 중...")
-                    progress_bar.progress(60)
-                    
-                    status_text.text("🛠️ 솔루션 매칭 중...")
-                    progress_bar.progress(80)
-                    
-                    proposal = processor.generate_proposal(
+                    # 토큰이 도착하는 대로 화면에 표시
+                    proposal = st.write_stream(processor.stream_proposal(
                         st.session_state.analysis_result,
                         st.session_state.projects_result,
                         st.session_state.solutions_result
-                    )
+                    ))
                     
-                    progress_bar.progress(100)
-                    status_text.text("✅ 제안서 생성 완료!")
-                    
-                    # 제안서를 세션 상태에 저장
+                    # 제안서와 생성 시간을 세션 상태에 저장
                     st.session_state.proposal_content = proposal
-                    
-                    time.sleep(1)
-                    progress_bar.empty()
-                    status_text.empty()
+                    st.session_state.proposal_metrics = processor.generation_metrics
                     
                     # 페이지 새로고침하여 생성된 제안서 표시
                     st.rerun()